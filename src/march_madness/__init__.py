@@ -1,30 +1,96 @@
+import hashlib
+import threading
+from datetime import datetime
 from pathlib import Path
+from typing import NamedTuple
+
 from march_madness.bracket import Bracket, Game, Team  # noqa: F401
 from march_madness.kenpom import update_bracket_kenpoms
-
+from march_madness.ratings_history import default_history
 
 INITIAL_BRACKET_PATH = Path("data/initial_bracket.json")
 CURRENT_BRACKET_PATH = Path("data/current_bracket.json")
 
 
-def get_bracket() -> Bracket:
-    if CURRENT_BRACKET_PATH.exists():
-        bracket = Bracket.model_validate_json(CURRENT_BRACKET_PATH.read_text())
-    elif INITIAL_BRACKET_PATH.exists():
-        bracket = Bracket.model_validate_json(INITIAL_BRACKET_PATH.read_text())
+class _CachedBracket(NamedTuple):
+    file_key: tuple[int, int]
+    """`(st_mtime_ns, st_size)` of the file when it was last checked."""
+    content_hash: str
+    bracket: Bracket
+    teams_by_espn_id: dict[str, Team]
+    teams_by_kenpom_id: dict[str, Team]
+
+
+_bracket_cache: dict[Path, _CachedBracket] = {}
+"""The last bracket parsed from each file. A file whose mtime and size are unchanged
+isn't read again, and one whose contents hash the same isn't parsed again."""
+_bracket_lock = threading.Lock()
+"""Guards `_bracket_cache`, which request threads and the refresh daemon share."""
+
+
+def _cached_bracket() -> _CachedBracket | None:
+    for path in (CURRENT_BRACKET_PATH, INITIAL_BRACKET_PATH):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        break
+    else:
+        return None
+
+    file_key = (stat.st_mtime_ns, stat.st_size)
+    with _bracket_lock:
+        cached = _bracket_cache.get(path)
+        if cached is not None and cached.file_key == file_key:
+            return cached
+
+        content = path.read_bytes()
+        content_hash = hashlib.sha256(content).hexdigest()
+        if cached is not None and cached.content_hash == content_hash:
+            cached = cached._replace(file_key=file_key)
+        else:
+            bracket = Bracket.model_validate_json(content)
+            update_bracket_kenpoms(bracket)
+            cached = _CachedBracket(
+                file_key=file_key,
+                content_hash=content_hash,
+                bracket=bracket,
+                teams_by_espn_id={team.espn_id: team for team in bracket.teams},
+                teams_by_kenpom_id={team.kenpom_id: team for team in bracket.teams},
+            )
+        _bracket_cache[path] = cached
+        return cached
+
+
+def get_bracket(as_of: datetime | None = None) -> Bracket:
+    """The current bracket with the latest KenPom ratings, or with the ratings saved
+    in the `RatingsHistory` at `as_of` if given. Results are always the current
+    ones.
+
+    The file is only parsed again when its contents change. Each call returns a new
+    copy, so callers are free to modify it."""
+    cached = _cached_bracket()
+    if not cached:
+        return None
+    bracket = cached.bracket.clone()
+    if as_of is not None:
+        update_bracket_kenpoms(bracket, default_history().ratings_as_of(as_of))
     else:
-        bracket = None
-    if bracket:
         update_bracket_kenpoms(bracket)
     return bracket
 
 
 def get_team(espn_id: str) -> Team | None:
-    bracket = get_bracket()
-    for team in bracket.teams:
-        if team.espn_id == espn_id:
-            return team
-    return None
+    """The team with this ESPN id, rated as of when the bracket file was last read.
+    Shared between callers, so don't modify it."""
+    cached = _cached_bracket()
+    return cached.teams_by_espn_id.get(espn_id) if cached else None
+
+
+def get_team_by_kenpom_id(kenpom_id: str) -> Team | None:
+    """The team with this KenPom id, like `get_team`."""
+    cached = _cached_bracket()
+    return cached.teams_by_kenpom_id.get(kenpom_id) if cached else None
 
 
 if __name__ == "__main__":
@@ -1,13 +1,17 @@
 import dash
-from dash import dcc, html
+from dash import Input, Output, dcc, html
 import plotly.graph_objects as go
 
 from march_madness import get_bracket, Bracket, Team, Game
-from march_madness.simulation2 import Simulation
+from march_madness.exact import ExactSimulation
+from march_madness.refresh import RefreshDaemon
 
 # Initialize the Dash app
 app = dash.Dash(__name__)
 
+# Set in `__main__`; publishes new group odds as ratings and results come in.
+refresh_daemon: RefreshDaemon | None = None
+
 
 def create_bracket(bracket: Bracket | None = None) -> go.Figure:
     """Creates a Plotly figure for the bracket."""
@@ -16,7 +20,7 @@ def create_bracket(bracket: Bracket | None = None) -> go.Figure:
     # # DEBUG: Force a winner
     # bracket.advance_winner(bracket.games[1], bracket.games[1].team2_index)
 
-    sim = Simulation(bracket=bracket, sim_count=100)
+    sim = ExactSimulation(bracket=bracket)
 
     figure = go.Figure()
 
@@ -297,9 +301,47 @@ app.layout = html.Div(
             children="This is the right component",
             style={"flex": "1", "padding": "10px"},
         ),
+        dcc.Interval(id="refresh-interval", interval=5_000),
     ],
 )
 
+
+@app.callback(Output("right", "children"), Input("refresh-interval", "n_intervals"))
+def show_group_odds(n_intervals: int | None):
+    update = refresh_daemon.latest if refresh_daemon else None
+    if update is None:
+        return "Waiting for the first simulation..."
+    return html.Div(
+        [
+            html.H3(f"Group odds as of {update.computed_at.astimezone():%H:%M:%S}"),
+            html.Ul(
+                [
+                    html.Li(f"{user}: {prob * 100:.1f}%")
+                    for user, prob in sorted(
+                        update.winner_prob.items(), key=lambda x: x[1], reverse=True
+                    )
+                ]
+            ),
+        ]
+    )
+
+
 # Run the app
 if __name__ == "__main__":
+    import os
+
+    from march_madness.group import Group
+    from march_madness.kenpom import url as kenpom_url
+    from march_madness.kenpom_fetch import BrowserSource, RatingsFetcher
+
+    # With debug on, this script also runs in the reloader's watcher process, which
+    # never serves requests. Only the serving child gets a daemon.
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        # Fetched ratings update the odds but don't replace the saved ones.
+        refresh_daemon = RefreshDaemon(
+            Group.load(),
+            fetcher=RatingsFetcher(BrowserSource(kenpom_url)),
+            save=False,
+        )
+        refresh_daemon.run_in_thread()
     app.run(debug=True, port=9001)
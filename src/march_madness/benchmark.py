@@ -0,0 +1,269 @@
+"""Simulation benchmarks on the bundled `data/` fixtures.
+
+Run with `python -m march_madness.benchmark`. Results are printed and written as
+JSON, and compared against `data/benchmarks/baseline.json` if it exists. Rates are
+absolute, so the baseline records the machine and Python it was measured on, and
+a run elsewhere only warns instead of failing."""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+
+from march_madness import INITIAL_BRACKET_PATH, Bracket
+from march_madness.compact import CompactBracket
+from march_madness.exact import ExactSimulation
+from march_madness.group import BracketEntry, Group, SimGroup
+from march_madness.kenpom import known_good_html_path, update_bracket_kenpoms
+from march_madness.kenpom_table import parse_ratings_html
+from march_madness.simulation import (
+    best_kenpom_wins,
+    best_seed_wins,
+    elo_style,
+    normal_distribution,
+    random_winner,
+    sim,
+)
+from march_madness.simulation2 import Simulation
+from march_madness.vectorized import BatchSimGroup, BatchSimulation
+
+baseline_path = Path("data/benchmarks/baseline.json")
+results_path = Path("data/benchmarks/latest.json")
+
+MIN_TIME = 0.2
+"""Seconds each timing run must last, to drown out timer noise."""
+REPEATS = 3
+ENTRY_COUNTS = [1, 10, 100, 1_000]
+
+
+def fixture_bracket() -> Bracket:
+    """The pre-tournament bracket, so every game is simulated."""
+    bracket = Bracket.model_validate_json(INITIAL_BRACKET_PATH.read_text())
+    update_bracket_kenpoms(bracket)
+    return bracket
+
+
+def fixture_group(entry_count: int) -> Group:
+    """`entry_count` entries, cycling through the bundled user brackets."""
+    entries = Group.load().entries
+    return Group(
+        entries=[
+            BracketEntry(
+                bracket=entries[index % len(entries)].bracket,
+                user=f"{entries[index % len(entries)].user}_{index}",
+                json_path=entries[index % len(entries)].json_path,
+            )
+            for index in range(entry_count)
+        ]
+    )
+
+
+def ops_per_second(run: Callable[[int], None]) -> float:
+    """Best rate over `REPEATS` runs of `run(count)`, which does `count` operations.
+
+    `count` doubles until one run takes at least `MIN_TIME`."""
+    count = 1
+    while True:
+        start = time.perf_counter()
+        run(count)
+        elapsed = time.perf_counter() - start
+        if elapsed >= MIN_TIME:
+            break
+        count *= 2
+    best = elapsed
+    for _ in range(REPEATS - 1):
+        start = time.perf_counter()
+        run(count)
+        best = min(best, time.perf_counter() - start)
+    return count / best
+
+
+def benchmarks() -> dict[str, Callable[[int], None]]:
+    """Benchmark name -> function doing that many simulations (or operations)."""
+    bracket = fixture_bracket()
+    other = fixture_group(1).entries[0].bracket
+    compact_bracket = CompactBracket.from_bracket(bracket)
+
+    cases: dict[str, Callable[[int], None]] = {}
+
+    for sim_game_function in [
+        random_winner,
+        best_kenpom_wins,
+        best_seed_wins,
+        normal_distribution,
+        elo_style,
+    ]:
+
+        def run_sim(count: int, sim_game_function=sim_game_function) -> None:
+            for _ in range(count):
+                sim(bracket, sim_game_function=sim_game_function)
+
+        cases[f"sim/{sim_game_function.__name__}"] = run_sim
+
+    cases["Simulation"] = lambda count: Simulation(
+        bracket=bracket, sim_count=count, suppress_print=True
+    )
+    cases["BatchSimulation"] = lambda count: BatchSimulation(
+        bracket=bracket, sim_count=count, seed=0, suppress_print=True
+    )
+
+    def run_exact(count: int) -> None:
+        for _ in range(count):
+            bracket.clear_win_probabilities()
+            ExactSimulation(bracket=bracket)
+
+    cases["ExactSimulation"] = run_exact
+
+    for entry_count in ENTRY_COUNTS:
+        group = fixture_group(entry_count)
+        cases[f"SimGroup/{entry_count}_entries"] = lambda count, group=group: SimGroup(
+            group=group, current_bracket=bracket, sim_count=count, suppress_print=True
+        )
+        cases[f"BatchSimGroup/{entry_count}_entries"] = (
+            lambda count, group=group: BatchSimGroup(
+                group=group,
+                current_bracket=bracket,
+                sim_count=count,
+                suppress_print=True,
+                seed=0,
+            )
+        )
+
+    def run_clone(count: int) -> None:
+        for _ in range(count):
+            bracket.clone()
+
+    def run_score(count: int) -> None:
+        for _ in range(count):
+            bracket.score(other)
+
+    def run_compact_clone(count: int) -> None:
+        for _ in range(count):
+            compact_bracket.clone()
+
+    cases["Bracket.clone"] = run_clone
+    cases["Bracket.score"] = run_score
+    cases["CompactBracket.clone"] = run_compact_clone
+
+    html = known_good_html_path.read_text(encoding="utf-8")
+
+    def run_parse_kenpom(count: int) -> None:
+        for _ in range(count):
+            parse_ratings_html(html)
+
+    cases["KenPom.parse"] = run_parse_kenpom
+    return cases
+
+
+def _cpu_model() -> str:
+    """The CPU's marketing name where the OS reports one."""
+    try:
+        with open("/proc/cpuinfo", encoding="utf-8") as file:
+            for line in file:
+                if line.startswith("model name"):
+                    return line.partition(":")[2].strip()
+    except OSError:
+        pass
+    return platform.processor() or platform.machine()
+
+
+def environment() -> dict:
+    """What the rates depend on besides the code."""
+    return {
+        "python": f"{platform.python_implementation()} {platform.python_version()}",
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu": _cpu_model(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def run_benchmarks(name_filter: str | None = None) -> dict:
+    results = {}
+    for name, run in benchmarks().items():
+        if name_filter and name_filter not in name:
+            continue
+        results[name] = ops_per_second(run)
+        print(f"{name:<32} {results[name]:>14,.1f} /s")
+    return {"environment": environment(), "ops_per_second": results}
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Names of benchmarks more than `tolerance` (a fraction) slower than baseline."""
+    regressions = []
+    for name, rate in results["ops_per_second"].items():
+        baseline_rate = baseline["ops_per_second"].get(name)
+        if baseline_rate is None:
+            continue
+        ratio = rate / baseline_rate
+        marker = ""
+        if ratio < 1 - tolerance:
+            regressions.append(name)
+            marker = "  <-- REGRESSION"
+        print(f"{name:<32} {ratio:>6.2f}x baseline{marker}")
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--filter", help="Only run benchmarks whose name contains this")
+    parser.add_argument("--output", type=Path, default=results_path)
+    parser.add_argument("--baseline", type=Path, default=baseline_path)
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Store these results as the new baseline",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="Allowed slowdown versus baseline, as a fraction (default 0.25)",
+    )
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.filter)
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(results, indent=4) + "\n")
+    print(f"Results saved to {args.output}")
+
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(results, indent=4) + "\n")
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+    if not args.baseline.exists():
+        print(
+            f"No baseline at {args.baseline}; run with --save-baseline to create one."
+        )
+        return 0
+
+    print()
+    baseline = json.loads(args.baseline.read_text())
+    regressions = compare(results, baseline, args.tolerance)
+    differences = {
+        key: (baseline.get("environment", {}).get(key), value)
+        for key, value in results["environment"].items()
+        if baseline.get("environment", {}).get(key) != value
+    }
+    if differences:
+        print("\nThe baseline was measured elsewhere, so the ratios are only a guide:")
+        for key, (baseline_value, value) in differences.items():
+            print(f"  {key}: {baseline_value} (baseline) vs {value}")
+        print("Run with --save-baseline on this machine for a real comparison.")
+        return 0
+    if regressions:
+        print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,12 @@
+import functools
 import math
+from typing import TYPE_CHECKING, NamedTuple
+
 import pydantic
 
+if TYPE_CHECKING:
+    from march_madness.scoring import ScoringSystem
+
 
 class Team(pydantic.BaseModel):
     name: str
@@ -29,9 +35,124 @@ class Game(pydantic.BaseModel):
     """1, 2, 4, 8, etc."""
 
 
+class BracketTopology(NamedTuple):
+    """How the games of a bracket feed into each other. Indexed by game id."""
+
+    round_of: tuple[int, ...]
+    next_game_id: tuple[int | None, ...]
+    """Game the winner advances to, or `None` for the final."""
+    next_is_team1: tuple[bool, ...]
+    """Whether the winner becomes `team1` (rather than `team2`) of the next game."""
+    previous_game_ids: tuple[tuple[int | None, int | None], ...]
+    """Games whose winners become `team1` and `team2`, or `None` if set from `teams`."""
+    initial_team_indexes: tuple[tuple[int | None, int | None], ...]
+    """`team1_index` and `team2_index` before any game is played."""
+    rounds: tuple[tuple[int, ...], ...]
+    """Game ids of each round, in the order the rounds are played."""
+    points: tuple[float, ...]
+    """Points for picking the winner: 10-20-40-80-160-320. First Four games score 0."""
+
+
+@functools.cache
+def bracket_topology(
+    num_teams: int,
+    play_in_slots: tuple[int, ...] = (),
+) -> BracketTopology:
+    """Build the game tree for a field of `num_teams`. Cached per field shape.
+
+    `num_teams - len(play_in_slots)` must be a power of two. Each of `play_in_slots`
+    (slot 0 is `team1` of the first main-bracket game) is filled by the winner of a
+    First Four game between two teams listed next to each other in `teams`. First
+    Four games come first, with `round_of == num_teams`."""
+    main_size = num_teams - len(play_in_slots)
+    if main_size < 2 or main_size & (main_size - 1):
+        raise ValueError(
+            f"{num_teams} teams with {len(play_in_slots)} play-in games "
+            f"does not leave a power of two main bracket"
+        )
+    if any(not 0 <= slot < main_size for slot in play_in_slots):
+        raise ValueError(f"Play-in slots must be in range(0, {main_size})")
+
+    round_of: list[int] = []
+    previous_game_ids: list[tuple[int | None, int | None]] = []
+    initial_team_indexes: list[tuple[int | None, int | None]] = []
+    rounds: list[tuple[int, ...]] = []
+
+    # Teams, or the play-in game, filling each main-bracket slot.
+    slot_teams: list[int | None] = []
+    slot_games: list[int | None] = []
+    team_index = 0
+    for slot in range(main_size):
+        if slot in play_in_slots:
+            slot_games.append(len(round_of))
+            slot_teams.append(None)
+            round_of.append(num_teams)
+            previous_game_ids.append((None, None))
+            initial_team_indexes.append((team_index, team_index + 1))
+            team_index += 2
+        else:
+            slot_games.append(None)
+            slot_teams.append(team_index)
+            team_index += 1
+    if play_in_slots:
+        rounds.append(tuple(range(len(round_of))))
+
+    previous_round_game_ids: list[int | None] = slot_games
+    previous_round_teams: list[int | None] = slot_teams
+    num_rounds = int(math.log2(main_size))
+    for round in range(num_rounds):
+        round_game_ids = []
+        for game_round_index in range(main_size // (2 * (2**round))):
+            team1_slot = 2 * game_round_index
+            team2_slot = 2 * game_round_index + 1
+            round_game_ids.append(len(round_of))
+            round_of.append(2 ** (num_rounds - round))
+            previous_game_ids.append(
+                (
+                    previous_round_game_ids[team1_slot],
+                    previous_round_game_ids[team2_slot],
+                )
+            )
+            initial_team_indexes.append(
+                (previous_round_teams[team1_slot], previous_round_teams[team2_slot])
+            )
+        rounds.append(tuple(round_game_ids))
+        previous_round_game_ids = round_game_ids
+        previous_round_teams = [None] * len(round_game_ids)
+
+    next_game_id: list[int | None] = [None] * len(round_of)
+    next_is_team1: list[bool] = [False] * len(round_of)
+    for game_id, (team1_game_id, team2_game_id) in enumerate(previous_game_ids):
+        if team1_game_id is not None:
+            next_game_id[team1_game_id] = game_id
+            next_is_team1[team1_game_id] = True
+        if team2_game_id is not None:
+            next_game_id[team2_game_id] = game_id
+
+    points = tuple(
+        0.0 if game_round_of > main_size else 640 / game_round_of
+        for game_round_of in round_of
+    )
+
+    return BracketTopology(
+        round_of=tuple(round_of),
+        next_game_id=tuple(next_game_id),
+        next_is_team1=tuple(next_is_team1),
+        previous_game_ids=tuple(previous_game_ids),
+        initial_team_indexes=tuple(initial_team_indexes),
+        rounds=tuple(rounds),
+        points=points,
+    )
+
+
 class Bracket(pydantic.BaseModel):
     teams: list[Team] = pydantic.Field(default_factory=list)
     games: list[Game] | None = None
+    play_in_slots: list[int] = pydantic.Field(default_factory=list)
+    """Main-bracket slots filled by First Four games. See `bracket_topology`."""
+    final_total_score: int | None = None
+    """Combined points scored in the championship game, for tiebreakers."""
+    _win_probabilities: dict = pydantic.PrivateAttr(default_factory=dict)
 
     @pydantic.model_validator(mode="after")
     def set_games_to_empty_list(self):
@@ -39,31 +160,22 @@ class Bracket(pydantic.BaseModel):
             self.games = self._generate_games_from_teams()
         return self
 
-    def _generate_games_from_teams(self) -> list[Game]:
-        games: list[Game] = []
-        game_id = 0
-
-        num_teams = len(self.teams)
-
-        num_rounds = int(math.log2(num_teams))
-
-        for round in range(num_rounds):
-            num_games = num_teams // (2 * (2**round))
-            round_of = 2 ** (num_rounds - round)
-            # print(f"{num_games=} {round_of=}")
-
-            for game_round_index in range(num_games):
-                game = Game(game_id=game_id, round_of=round_of)
-                games.append(game)
-                game_id += 1
-
-        for index in range(num_teams // 2):
-            game = games[index]
-            game.team1_index = index * 2
-            game.team2_index = index * 2 + 1
-            # game.team2 = self.teams[index * 2 + 1]
+    def topology(self) -> BracketTopology:
+        return bracket_topology(len(self.teams), tuple(self.play_in_slots))
 
-        return games
+    def _generate_games_from_teams(self) -> list[Game]:
+        topology = self.topology()
+        return [
+            Game(
+                game_id=game_id,
+                round_of=round_of,
+                team1_index=team1_index,
+                team2_index=team2_index,
+            )
+            for game_id, (round_of, (team1_index, team2_index)) in enumerate(
+                zip(topology.round_of, topology.initial_team_indexes)
+            )
+        ]
 
     def undecided_games(self) -> list[Game]:
         return [game for game in self.games if game.winner_index is None]
@@ -82,49 +194,40 @@ class Bracket(pydantic.BaseModel):
         self.games[game.game_id].winner_index = winner_index
 
         # Advance the winner
-
-        round_start_index = -1
-
-        if game.round_of == 64:
-            round_start_index = 0
-            next_round_start_index = 32
-        elif game.round_of == 32:
-            round_start_index = 32
-            next_round_start_index = 48
-        elif game.round_of == 16:
-            round_start_index = 48
-            next_round_start_index = 56
-        elif game.round_of == 8:
-            round_start_index = 56
-            next_round_start_index = 60
-        elif game.round_of == 4:
-            round_start_index = 60
-            next_round_start_index = 62
-        elif game.round_of == 2:
+        topology = self.topology()
+        next_game_id = topology.next_game_id[game.game_id]
+        if next_game_id is None:
             return
-        elif game.round_of == 1:
-            return
-
-        within_round_index = game.game_id - round_start_index
-        within_next_round_index = within_round_index // 2
-        is_next_round_team1 = within_round_index % 2 == 0
-        next_game_id = next_round_start_index + within_next_round_index
-        if is_next_round_team1:
+        if topology.next_is_team1[game.game_id]:
             self.games[next_game_id].team1_index = winner_index
         else:
             self.games[next_game_id].team2_index = winner_index
 
-    def score(self, other: "Bracket") -> int:
+    def score(self, other: "Bracket", scoring: "ScoringSystem | None" = None) -> int:
+        if scoring is not None:
+            return scoring.score(self, other)
         score = 0
+        points = self.topology().points
         for game, other_game in zip(self.games, other.games):
             game: Game
             other_game: Game
             if game.winner_index == other_game.winner_index:
-                score += 640 / game.round_of
+                score += points[game.game_id]
         return score
 
     def clone(self) -> "Bracket":
-        return Bracket.model_validate_json(self.model_dump_json())
+        bracket = Bracket.model_validate_json(self.model_dump_json())
+        # Same teams and ratings, so the win probability matrices still apply.
+        bracket._win_probabilities = self._win_probabilities
+        return bracket
+
+    def win_probability_cache(self) -> dict:
+        """Win probability matrices for these teams, keyed by `WinProbabilityModel`."""
+        return self._win_probabilities
+
+    def clear_win_probabilities(self) -> None:
+        """Forget cached win probability matrices. Call after changing any rating."""
+        self._win_probabilities = {}
 
 
 if __name__ == "__main__":
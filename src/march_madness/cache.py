@@ -0,0 +1,146 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import pydantic
+
+from march_madness import Bracket
+from march_madness.group import Group
+from march_madness.scoring import ESPN, ScoringSystem
+from march_madness.vectorized import BatchSimGroup, winner_counts
+from march_madness.win_probability import EloStyle, WinProbabilityModel
+
+CACHE_VERSION = 2
+"""Bump whenever a change to the engine would change results for the same key."""
+
+sim_cache_folder = Path("data/sim_cache")
+
+
+class CachedSimResults(pydantic.BaseModel):
+    key: str
+    sim_count: int
+    game_counts: dict[int, dict[int, int]]
+    """Game id -> team index -> number of simulations the team won that game."""
+    user_average_scores: dict[str, float]
+    winner_prob: dict[str, float]
+    no_winner_prob: float = 0
+    """Share of simulations where nobody scored any points."""
+
+
+def sim_cache_key(
+    *,
+    bracket: Bracket,
+    model: WinProbabilityModel,
+    seed: int,
+    sim_count: int,
+    group: Group,
+    scoring: ScoringSystem = ESPN,
+) -> str:
+    """Hash of everything that determines the results of a `BatchSimGroup`.
+
+    The bracket's teams carry their kenpom ratings, so the ratings snapshot is part
+    of the key too."""
+    payload = {
+        "version": CACHE_VERSION,
+        "bracket": bracket.model_dump(mode="json"),
+        "model": [type(model).__name__, model.model_dump(mode="json")],
+        "scoring": [type(scoring).__name__, scoring.model_dump(mode="json")],
+        "seed": seed,
+        "sim_count": sim_count,
+        "entries": [
+            [entry.user, [game.winner_index for game in entry.bracket.games]]
+            for entry in group.entries
+        ],
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+class SimCache:
+    """Content-addressed store of simulation results, one JSON file per key.
+
+    Reading a result touches its file, and storing one evicts the least recently
+    used files until the folder is under `max_bytes`."""
+
+    def __init__(self, folder: Path = sim_cache_folder, max_bytes: int = 100_000_000):
+        self.folder = Path(folder)
+        self.max_bytes = max_bytes
+
+    def _path(self, key: str) -> Path:
+        return self.folder / f"{key}.json"
+
+    def get(self, key: str) -> CachedSimResults | None:
+        path = self._path(key)
+        if not path.exists():
+            return None
+        os.utime(path)
+        return CachedSimResults.model_validate_json(path.read_text())
+
+    def put(self, results: CachedSimResults) -> None:
+        self.folder.mkdir(parents=True, exist_ok=True)
+        self._path(results.key).write_text(results.model_dump_json())
+        self._evict()
+
+    def _evict(self) -> None:
+        paths = sorted(
+            self.folder.glob("*.json"), key=lambda path: path.stat().st_mtime
+        )
+        total_bytes = sum(path.stat().st_size for path in paths)
+        for path in paths[:-1]:
+            if total_bytes <= self.max_bytes:
+                break
+            total_bytes -= path.stat().st_size
+            path.unlink()
+
+
+def cached_sim_group(
+    group: Group,
+    current_bracket: Bracket,
+    sim_count: int = 100,
+    *,
+    model: WinProbabilityModel = EloStyle(),
+    seed: int = 40351,
+    cache: SimCache | None = None,
+    suppress_print: bool = False,
+    scoring: ScoringSystem = ESPN,
+) -> CachedSimResults:
+    """Results of a `BatchSimGroup`, from `cache` if this exact scenario was run."""
+    cache = cache or SimCache()
+    key = sim_cache_key(
+        bracket=current_bracket,
+        model=model,
+        seed=seed,
+        sim_count=sim_count,
+        group=group,
+        scoring=scoring,
+    )
+    results = cache.get(key)
+    if results is not None:
+        if not suppress_print:
+            print(f"Using cached results {key[:12]}")
+        return results
+
+    sim_group = BatchSimGroup(
+        group=group,
+        current_bracket=current_bracket,
+        sim_count=sim_count,
+        suppress_print=suppress_print,
+        seed=seed,
+        model=model,
+        scoring=scoring,
+    )
+    counts = winner_counts(sim_group.outcomes, len(current_bracket.teams))
+    results = CachedSimResults(
+        key=key,
+        sim_count=sim_count,
+        game_counts={game_id: dict(counter) for game_id, counter in counts.items()},
+        user_average_scores=sim_group.user_average_scores,
+        winner_prob={
+            user: prob
+            for user, prob in sim_group.winner_prob.items()
+            if user is not None
+        },
+        no_winner_prob=sim_group.winner_prob.get(None, 0),
+    )
+    cache.put(results)
+    return results
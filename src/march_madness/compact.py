@@ -0,0 +1,140 @@
+import numpy as np
+
+from march_madness.bracket import Bracket, Game, Team
+
+TEAM1 = 0
+TEAM2 = 1
+WINNER = 2
+NO_TEAM = -1
+"""Stands in for `None` in the int8 state arrays."""
+
+
+class CompactBracket:
+    """Array-backed bracket state that is cheap to clone.
+
+    The per-game state lives in one `(3, num_games)` int8 buffer, with rows `TEAM1`,
+    `TEAM2` and `WINNER` and `NO_TEAM` for `None`. `teams` and the topology arrays
+    never change during a tournament, so clones share them by reference and `clone()`
+    only copies the ~200 byte state buffer."""
+
+    __slots__ = (
+        "teams",
+        "play_in_slots",
+        "round_of",
+        "next_game",
+        "next_row",
+        "points",
+        "state",
+    )
+
+    def __init__(
+        self,
+        teams: list[Team],
+        play_in_slots: list[int],
+        round_of: np.ndarray,
+        next_game: np.ndarray,
+        next_row: np.ndarray,
+        points: np.ndarray,
+        state: np.ndarray,
+    ):
+        self.teams = teams
+        self.play_in_slots = play_in_slots
+        self.round_of = round_of
+        self.next_game = next_game
+        """Game id the winner of each game advances to, or `NO_TEAM` for the final."""
+        self.next_row = next_row
+        """`TEAM1` or `TEAM2`: which side of `next_game` the winner takes."""
+        self.points = points
+        self.state = state
+
+    @property
+    def team1(self) -> np.ndarray:
+        return self.state[TEAM1]
+
+    @property
+    def team2(self) -> np.ndarray:
+        return self.state[TEAM2]
+
+    @property
+    def winner(self) -> np.ndarray:
+        return self.state[WINNER]
+
+    @classmethod
+    def from_bracket(cls, bracket: Bracket) -> "CompactBracket":
+        state = np.full((3, len(bracket.games)), NO_TEAM, dtype=np.int8)
+        for game in bracket.games:
+            for row, index in (
+                (TEAM1, game.team1_index),
+                (TEAM2, game.team2_index),
+                (WINNER, game.winner_index),
+            ):
+                if index is not None:
+                    state[row, game.game_id] = index
+
+        topology = bracket.topology()
+        round_of = np.array(topology.round_of, dtype=np.int16)
+        next_game = np.array(
+            [
+                NO_TEAM if game_id is None else game_id
+                for game_id in topology.next_game_id
+            ],
+            dtype=np.int8,
+        )
+        next_row = np.where(topology.next_is_team1, TEAM1, TEAM2).astype(np.int8)
+        points = np.array(topology.points)
+        for array in (round_of, next_game, next_row, points):
+            array.setflags(write=False)
+
+        return cls(
+            teams=bracket.teams,
+            play_in_slots=bracket.play_in_slots,
+            round_of=round_of,
+            next_game=next_game,
+            next_row=next_row,
+            points=points,
+            state=state,
+        )
+
+    def to_bracket(self) -> Bracket:
+        def index_or_none(value: int) -> int | None:
+            return None if value == NO_TEAM else int(value)
+
+        games = [
+            Game(
+                game_id=game_id,
+                round_of=int(self.round_of[game_id]),
+                team1_index=index_or_none(self.team1[game_id]),
+                team2_index=index_or_none(self.team2[game_id]),
+                winner_index=index_or_none(self.winner[game_id]),
+            )
+            for game_id in range(self.state.shape[1])
+        ]
+        return Bracket(
+            teams=[team.model_copy() for team in self.teams],
+            games=games,
+            play_in_slots=list(self.play_in_slots),
+        )
+
+    def clone(self) -> "CompactBracket":
+        return CompactBracket(
+            teams=self.teams,
+            play_in_slots=self.play_in_slots,
+            round_of=self.round_of,
+            next_game=self.next_game,
+            next_row=self.next_row,
+            points=self.points,
+            state=self.state.copy(),
+        )
+
+    def undecided_game_ids(self) -> np.ndarray:
+        return np.flatnonzero(self.winner == NO_TEAM)
+
+    def advance_winner(self, game_id: int, winner_index: int) -> None:
+        self.winner[game_id] = winner_index
+        next_game_id = self.next_game[game_id]
+        if next_game_id != NO_TEAM:
+            self.state[self.next_row[game_id], next_game_id] = winner_index
+
+    def score(self, other: "CompactBracket") -> float:
+        correct = self.winner == other.winner
+        return float(np.sum(self.points[correct]))
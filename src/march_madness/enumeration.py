@@ -0,0 +1,140 @@
+from typing import NamedTuple
+
+import numpy as np
+
+from march_madness import Bracket, get_bracket
+from march_madness.group import Group
+from march_madness.scoring import ESPN, ScoringSystem
+from march_madness.vectorized import contestants, pick_matrix, win_shares
+from march_madness.win_probability import EloStyle, WinProbabilityModel
+
+MAX_UNDECIDED_GAMES = 15
+"""2**15 outcomes from the Sweet 16 onward. Each added game doubles the work."""
+
+
+def enumerate_outcomes(
+    bracket: Bracket,
+    probabilities: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Every way the undecided games can go, with its probability.
+
+    Bit `k` of row `r` says whether `team1` wins the `k`th undecided game in play
+    order. Returns the `(2**undecided, num_games)` winner indices, in the same form as
+    `simulate_outcomes`, and the `(2**undecided,)` probability of each row."""
+    undecided_count = len(bracket.undecided_games())
+    row_count = 2**undecided_count
+    masks = np.arange(row_count, dtype=np.int64)
+    outcomes = np.full((row_count, len(bracket.games)), -1, dtype=np.int8)
+    weights = np.ones(row_count)
+
+    bit = 0
+    for game_ids in bracket.topology().rounds:
+        undecided = []
+        for game_id in game_ids:
+            winner_index = bracket.games[game_id].winner_index
+            if winner_index is None:
+                undecided.append(game_id)
+            else:
+                outcomes[:, game_id] = winner_index
+        if undecided:
+            team1 = contestants(bracket, outcomes, undecided, side=0)
+            team2 = contestants(bracket, outcomes, undecided, side=1)
+            bits = np.arange(bit, bit + len(undecided))
+            team1_wins = (masks[:, None] >> bits[None, :]) & 1 == 1
+            team1_win_prob = probabilities[team1, team2]
+            outcomes[:, undecided] = np.where(team1_wins, team1, team2)
+            game_probs = np.where(team1_wins, team1_win_prob, 1 - team1_win_prob)
+            weights *= game_probs.prod(axis=1)
+            bit += len(undecided)
+    return outcomes, weights
+
+
+class ExactGroupResults(NamedTuple):
+    users: list[str]
+    outcomes: np.ndarray
+    """`(outcome_count, num_games)` winner indices of every possible outcome."""
+    weights: np.ndarray
+    """Probability of each outcome."""
+    scores: np.ndarray
+    """`(outcome_count, len(users))` score of each entry under each outcome."""
+    winner_prob: dict[str, float]
+    """Chance of winning the group, with ties splitting the win evenly (see
+    `win_shares`)."""
+    average_scores: dict[str, float]
+    rank_probabilities: dict[str, list[float]]
+    """`[place]` chance of each finish. Tied entries share the better place (1-2-2-4)."""
+
+
+def exact_group_results(
+    group: Group,
+    bracket: Bracket,
+    model: WinProbabilityModel = EloStyle(),
+    max_undecided_games: int = MAX_UNDECIDED_GAMES,
+    scoring: ScoringSystem = ESPN,
+) -> ExactGroupResults:
+    """Exact group standings from every remaining outcome, weighted by its probability."""
+    undecided_count = len(bracket.undecided_games())
+    if undecided_count > max_undecided_games:
+        raise ValueError(
+            f"{undecided_count} undecided games is more than {max_undecided_games} "
+            f"({2**undecided_count:,} outcomes); simulate instead"
+        )
+
+    users = [entry.user for entry in group.entries]
+    outcomes, weights = enumerate_outcomes(bracket, model.matrix(bracket))
+    scores = scoring.score_matrix(bracket, outcomes, pick_matrix(group.entries))
+
+    rank_probabilities = np.zeros((len(users), len(users)))
+    for entry_index in range(len(users)):
+        # Place is the number of entries with a strictly higher score (0 is first).
+        places = (scores > scores[:, entry_index, None]).sum(axis=1)
+        rank_probabilities[entry_index] = np.bincount(
+            places, weights=weights, minlength=len(users)
+        )
+
+    return ExactGroupResults(
+        users=users,
+        outcomes=outcomes,
+        weights=weights,
+        scores=scores,
+        winner_prob={
+            user: float(share)
+            for user, share in zip(users, weights @ win_shares(scores))
+        },
+        average_scores={
+            user: float(score) for user, score in zip(users, weights @ scores)
+        },
+        rank_probabilities={
+            user: rank_probabilities[entry_index].tolist()
+            for entry_index, user in enumerate(users)
+        },
+    )
+
+
+if __name__ == "__main__":
+    from rich import box
+    from rich.console import Console
+    from rich.table import Table
+
+    group = Group.load()
+    results = exact_group_results(group, get_bracket())
+
+    table = Table(
+        title="Exact Group Standings",
+        box=box.ROUNDED,
+        caption=f"All {len(results.weights):,} remaining outcomes",
+    )
+    table.add_column("Name")
+    table.add_column("Win %")
+    table.add_column("Average score")
+    table.add_column("Most likely place")
+    for user in sorted(results.users, key=lambda user: -results.winner_prob[user]):
+        place_probabilities = results.rank_probabilities[user]
+        place = int(np.argmax(place_probabilities))
+        table.add_row(
+            user.split("_")[0].capitalize(),
+            f"{results.winner_prob[user] * 100:>6.2f}%",
+            f"{results.average_scores[user]:,.1f}",
+            f"{place + 1} ({place_probabilities[place] * 100:.1f}%)",
+        )
+    Console().print(table)
@@ -0,0 +1,88 @@
+import numpy as np
+
+from march_madness import Bracket, get_bracket
+from march_madness.simulation2 import Simulation
+from march_madness.win_probability import EloStyle, WinProbabilityModel
+
+
+def advancement_probabilities(
+    bracket: Bracket,
+    model: WinProbabilityModel = EloStyle(),
+) -> np.ndarray:
+    """Exact chance of each team winning each game, with no sampling.
+
+    Returns `probabilities` where `probabilities[game_id, team_index]` is the chance
+    that the team wins that game. A game's winner is one of its two feeder games'
+    winners, so it's the chance of winning the feeder times the chance of beating
+    each possible opponent from the other feeder."""
+    matrix = model.matrix(bracket)
+    topology = bracket.topology()
+    num_teams = len(bracket.teams)
+    probabilities = np.zeros((len(bracket.games), num_teams))
+
+    def contestant(game_id: int, team_index: int | None, side: int) -> np.ndarray:
+        previous_game_id = topology.previous_game_ids[game_id][side]
+        if previous_game_id is not None:
+            return probabilities[previous_game_id]
+        team = np.zeros(num_teams)
+        team[team_index] = 1
+        return team
+
+    for game_ids in topology.rounds:
+        for game_id in game_ids:
+            game = bracket.games[game_id]
+            if game.winner_index is not None:
+                probabilities[game_id, game.winner_index] = 1
+                continue
+            team1 = contestant(game_id, game.team1_index, side=0)
+            team2 = contestant(game_id, game.team2_index, side=1)
+            probabilities[game_id] = team1 * (matrix @ team2) + team2 * (matrix @ team1)
+    return probabilities
+
+
+def exact_results(
+    bracket: Bracket,
+    model: WinProbabilityModel = EloStyle(),
+) -> dict[int, list[tuple[str, float]]]:
+    """Exact version of `Simulation.results` for every game, keyed by game id."""
+    probabilities = advancement_probabilities(bracket, model)
+    results = {}
+    for game in bracket.games:
+        team_indexes = np.flatnonzero(probabilities[game.game_id])
+        results[game.game_id] = sorted(
+            (
+                (bracket.teams[index].name, float(probabilities[game.game_id, index]))
+                for index in team_indexes
+            ),
+            key=lambda result: result[1],
+            reverse=True,
+        )
+    return results
+
+
+class ExactSimulation(Simulation):
+    """Drop-in replacement for `Simulation` that reports exact probabilities."""
+
+    def __init__(
+        self,
+        *,
+        bracket: Bracket,
+        model: WinProbabilityModel = EloStyle(),
+    ):
+        self.model = model
+        self._exact_results: dict[int, list[tuple[str, float]]] = {}
+        super().__init__(bracket=bracket, sim_count=0, suppress_print=True)
+
+    def results(self, game_id: int) -> list[tuple[str, float]]:
+        return self._exact_results[game_id]
+
+    def _do_sim(self) -> None:
+        self._exact_results = exact_results(self.bracket, self.model)
+
+
+if __name__ == "__main__":
+    simulation = ExactSimulation(bracket=get_bracket())
+    for game_id in range(63):
+        print(f"Game {game_id}:")
+        print(simulation.pretty_results(game_id))
+        print()
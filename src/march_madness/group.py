@@ -1,10 +1,12 @@
 from collections import Counter, defaultdict
 from pathlib import Path
+from typing import NamedTuple
 
 import pydantic
 
 from march_madness.bracket import Bracket, Team
 from march_madness import get_bracket
+from march_madness.scoring import ESPN, ScoringSystem
 
 url = "https://fantasy.espn.com/games/tournament-challenge-bracket-2025/group?id=79ec54c4-676f-4a01-a758-613a6f4d40d4"
 user_brackets_folder = Path("data/user_brackets/parsed")
@@ -25,7 +27,7 @@ class BracketEntry(pydantic.BaseModel):
     user: str | None = None
     url: str | None = None
     json_path: Path | None = None
-    score: int | None = None
+    score: int | float | None = None
     """Score in bracket challenge."""
 
     predicted_final_score: int | None = None
@@ -48,6 +50,10 @@ class BracketEntry(pydantic.BaseModel):
     #         value = Path(value)
     #     return value
 
+    def picks(self) -> tuple[int | None, ...]:
+        """Winner index picked in each game."""
+        return tuple(game.winner_index for game in self.bracket.games)
+
     def save(self) -> None:
         if self.json_path is None:
             raise ValueError("json_path is None")
@@ -55,8 +61,65 @@ class BracketEntry(pydantic.BaseModel):
         self.json_path.write_text(self.model_dump_json(indent=4))
 
 
+class EntryCluster(NamedTuple):
+    """Entries with identical picks, scored once for all of them."""
+
+    picks: tuple[int | None, ...]
+    entries: list[BracketEntry]
+    differences: tuple[int, ...]
+    """Game ids where `picks` differ from the group's consensus picks."""
+
+
+def cluster_entries(
+    entries: list[BracketEntry],
+) -> tuple[list[EntryCluster], tuple[int | None, ...]]:
+    """Collapse entries with identical picks. Also returns the consensus: the most
+    common pick of each game across the clusters."""
+    entries_by_picks: dict[tuple[int | None, ...], list[BracketEntry]] = defaultdict(
+        list
+    )
+    for entry in entries:
+        entries_by_picks[entry.picks()].append(entry)
+    if not entries_by_picks:
+        return [], ()
+
+    consensus = tuple(
+        Counter(game_picks).most_common(1)[0][0]
+        for game_picks in zip(*entries_by_picks)
+    )
+    clusters = [
+        EntryCluster(
+            picks=picks,
+            entries=same_picks,
+            differences=tuple(
+                game_id
+                for game_id, (pick, consensus_pick) in enumerate(zip(picks, consensus))
+                if pick != consensus_pick
+            ),
+        )
+        for picks, same_picks in entries_by_picks.items()
+    ]
+    return clusters, consensus
+
+
 class Group(pydantic.BaseModel):
     entries: list[BracketEntry] = pydantic.Field(default_factory=list)
+    _clusters: list[EntryCluster] = pydantic.PrivateAttr(default_factory=list)
+    _consensus: tuple[int | None, ...] = pydantic.PrivateAttr(default=())
+
+    def model_post_init(self, context) -> None:
+        self.cluster_entries()
+
+    def cluster_entries(self) -> None:
+        """Hash every entry's picks into `clusters()`. Called when the group is built;
+        call again after changing `entries`."""
+        self._clusters, self._consensus = cluster_entries(self.entries)
+
+    def clusters(self) -> list[EntryCluster]:
+        return self._clusters
+
+    def consensus_picks(self) -> tuple[int | None, ...]:
+        return self._consensus
 
     @classmethod
     def load(cls) -> "Group":
@@ -67,17 +130,40 @@ class Group(pydantic.BaseModel):
             entries.append(entry)
         return cls(entries=entries)
 
-    def score_all(self, actual_bracket: Bracket) -> BracketEntry:
-        """Score all entries. Return the winner.
-
-        TODO: Deal with ties."""
+    def score_all(
+        self,
+        actual_bracket: Bracket,
+        scoring: ScoringSystem = ESPN,
+    ) -> BracketEntry:
+        """Score all entries. Return the winner."""
         for entry in self.entries:
-            entry.score = actual_bracket.score(entry.bracket)
-        return self.winner()
+            entry.score = actual_bracket.score(entry.bracket, scoring)
+        final_total_score = actual_bracket.final_total_score
+        return self.winner(final_total_score if scoring.tiebreaker else None)
+
+    def winners(self, final_total_score: int | None = None) -> list[BracketEntry]:
+        """Entries tied for the best score, in entry order.
+
+        If `final_total_score` is known, only the tied entries whose
+        `predicted_final_score` is closest to it remain. Entries without a prediction
+        lose the tiebreaker."""
+        best_score = max(entry.score for entry in self.entries)
+        winners = [entry for entry in self.entries if entry.score == best_score]
+        if final_total_score is not None and len(winners) > 1:
 
-    def winner(self) -> BracketEntry:
-        """TODO: Deal with ties."""
-        return max(self.entries, key=lambda entry: entry.score)
+            def miss(entry: BracketEntry) -> float:
+                if entry.predicted_final_score is None:
+                    return float("inf")
+                return abs(entry.predicted_final_score - final_total_score)
+
+            closest = min(miss(entry) for entry in winners)
+            winners = [entry for entry in winners if miss(entry) == closest]
+        return winners
+
+    def winner(self, final_total_score: int | None = None) -> BracketEntry:
+        """First of `winners()`. Ties the tiebreaker can't settle go to the earliest
+        entry."""
+        return self.winners(final_total_score)[0]
 
 
 class SimGroup:
@@ -87,31 +173,72 @@ class SimGroup:
         current_bracket: Bracket,
         sim_count: int = 100,
         suppress_print: bool = False,
+        seed: int | None = None,
+        scoring: ScoringSystem = ESPN,
+        factor_shared_picks: bool = False,
     ) -> None:
         self.group = group
         self.current_bracket = current_bracket
         self.sim_count = sim_count
         self._suppress_print = suppress_print
+        self.seed = seed
+        self.scoring = scoring
+        self.factor_shared_picks = factor_shared_picks
+        """Score each distinct bracket as the consensus score plus the games where it
+        differs, so the cost grows with the number of differing picks."""
 
         self._user_total_scores: dict[str, float] = {
             entry.user: 0 for entry in self.group.entries
         }
         self.user_average_scores: dict[str, float] = {}
-        self._winner_counter: Counter[str, int] = Counter()
+        self._winner_counter: Counter[str, float] = Counter()
+        """Simulations won by each user. Tied users split a simulation evenly."""
         self.winner_prob: dict[str, float] = {}
 
         self._do_sim()
 
     def _callback(self, bracket: Bracket) -> None:
-        winner = None
+        game_points = self.scoring.game_points(bracket)
+        winner_indexes = [game.winner_index for game in bracket.games]
+        if self.factor_shared_picks:
+            consensus = self.group.consensus_picks()
+            consensus_score = sum(
+                points
+                for points, winner_index, pick in zip(
+                    game_points, winner_indexes, consensus
+                )
+                if winner_index == pick
+            )
+
+        winners = [None]
         winning_score = 0
-        for entry in self.group.entries:
-            entry_score = bracket.score(entry.bracket)
-            if entry_score > winning_score:
-                winner = entry.user
-                winning_score = entry_score
-            self._user_total_scores[entry.user] += entry_score
-        self._winner_counter[winner] += 1
+        for cluster in self.group.clusters():
+            if self.factor_shared_picks:
+                cluster_score = consensus_score
+                for game_id in cluster.differences:
+                    if cluster.picks[game_id] == winner_indexes[game_id]:
+                        cluster_score += game_points[game_id]
+                    elif consensus[game_id] == winner_indexes[game_id]:
+                        cluster_score -= game_points[game_id]
+            else:
+                cluster_score = sum(
+                    points
+                    for points, winner_index, pick in zip(
+                        game_points, winner_indexes, cluster.picks
+                    )
+                    if winner_index == pick
+                )
+
+            users = [entry.user for entry in cluster.entries]
+            if cluster_score > winning_score:
+                winners = users
+                winning_score = cluster_score
+            elif cluster_score == winning_score and winning_score > 0:
+                winners = winners + users
+            for user in users:
+                self._user_total_scores[user] += cluster_score
+        for winner in winners:
+            self._winner_counter[winner] += 1 / len(winners)
 
     def _do_sim(self):
         from march_madness.simulation2 import Simulation
@@ -121,8 +248,11 @@ class SimGroup:
             sim_count=self.sim_count,
             callback=self._callback,
             suppress_print=self._suppress_print,
+            seed=self.seed,
         )
+        self._summarize()
 
+    def _summarize(self) -> None:
         self.user_average_scores = {
             user: total_score / self.sim_count
             for user, total_score in self._user_total_scores.items()
@@ -135,61 +265,50 @@ class SimGroup:
 
 def enumerate_final_four(
     bracket: Bracket,
+    group: Group | None = None,
 ):
+    from rich import box
+    from rich.console import Console
+    from rich.table import Table
+
+    from march_madness.enumeration import exact_group_results
+
     assert bracket.current_round_of() == 4
 
+    group = group or Group.load()
+    results = exact_group_results(group, bracket)
+
     semifinal_1 = bracket.games[-3]
     semifinal_2 = bracket.games[-2]
     final_game = bracket.games[-1]
 
-    results = []
+    def semifinal_title(game) -> str:
+        team1 = bracket.teams[game.team1_index]
+        team2 = bracket.teams[game.team2_index]
+        return f"{team1.espn_id}/{team2.espn_id} winner"
 
-    if semifinal_1.winner_index is  None:
-        semifinal_1_possible_winners = [
-            bracket.teams[semifinal_1.team1_index],
-            bracket.teams[semifinal_1.team2_index],
-        ]
-    else:
-        semifinal_1_possible_winners = [
-            bracket.teams[semifinal_1.winner_index]
-        ]
-    
-    if semifinal_2.winner_index is None:
-        semifinal_2_possible_winners = [
-            bracket.teams[semifinal_2.team1_index],
-            bracket.teams[semifinal_2.team2_index],
-        ]
-    else:
-        semifinal_2_possible_winners = [
-            bracket.teams[semifinal_2.winner_index]
-        ]
-
-
-    for semifinal_1_winner in semifinal_1_possible_winners:
-        sim_bracket = bracket.clone()
-        sim_bracket.advance_winner(semifinal_1, semifinal_1_winner.index)
-        for semifinal_2_winner in semifinal_2_possible_winners:
-            sim_bracket.advance_winner(semifinal_2, semifinal_2_winner.index)
-
-            for final_winner in [semifinal_1_winner, semifinal_2_winner]:
-                sim_bracket.advance_winner(final_game, final_winner.index)
-                group = Group.load()
-                winner = group.score_all(sim_bracket)
-                results.append((bracket.teams[semifinal_1_winner.index], bracket.teams[semifinal_2_winner.index], bracket.teams[final_winner.index], winner))
-                # results.append(sim_bracket)
-    
     table = Table(title="Final Four Enumeration", box=box.ROUNDED)
-    table.add_column("AUB/FLA winner")
-    table.add_column("DUKE/HOU winner")
+    table.add_column(semifinal_title(semifinal_1))
+    table.add_column(semifinal_title(semifinal_2))
     table.add_column("Champion")
     table.add_column("Group Winner")
-
-    for semifinal_1_winner, semifinal_2_winner, final_winner, ssc_winner in results:
+    table.add_column("Probability")
+
+    for outcome, weight, scores in zip(
+        results.outcomes, results.weights, results.scores
+    ):
+        winning_score = scores.max()
+        group_winners = [
+            user.split("_")[0].capitalize()
+            for user, score in zip(results.users, scores)
+            if score == winning_score
+        ]
         table.add_row(
-            f"{semifinal_1_winner.name}",
-            f"{semifinal_2_winner.name}",
-            f"{final_winner.name}",
-            f"{ssc_winner.bracket_name.split("_")[0].capitalize():<4}" + f" ({ssc_winner.score:,.0f} points)",
+            bracket.teams[outcome[semifinal_1.game_id]].name,
+            bracket.teams[outcome[semifinal_2.game_id]].name,
+            bracket.teams[outcome[final_game.game_id]].name,
+            f"{'/'.join(group_winners)} ({winning_score:,.0f} points)",
+            f"{weight * 100:.1f}%",
         )
     console = Console()
     console.print(table)
@@ -211,8 +330,28 @@ if __name__ == "__main__":
     # bracket_entry.save()
     # # print(bracket_entry.json_path.read_text())
     # print("Done")
+    import argparse
+
     from rich.pretty import pprint
 
+    from march_madness.cache import cached_sim_group
+    from march_madness.kenpom import get_kenpom_data
+    from march_madness.leverage import leverage_report
+    from march_madness.ratings_history import ratings_hash
+    from march_madness.variance import compare_winners
+
+    parser = argparse.ArgumentParser(description="Simulate the group's odds")
+    parser.add_argument(
+        "--paired",
+        action="store_true",
+        help=(
+            "Re-simulate both results of each current-round game with shared random "
+            "draws, which gives each difference a standard error but takes two runs "
+            "per game"
+        ),
+    )
+    args = parser.parse_args()
+
     group = Group.load()
     pprint(group)
 
@@ -221,32 +360,34 @@ if __name__ == "__main__":
 
     sim_result_json_path = Path(f"data/sim_results/{title}.json")
 
-    if not sim_result_json_path.exists():
-        sim_group = SimGroup(
-            group=group, current_bracket=get_bracket(), sim_count=100_000
-        )
-        print(f"\nAVERAGE SCORES:")
-        pprint(
-            sorted(
-                sim_group.user_average_scores.items(), key=lambda x: (x[1]), reverse=True
-            ),
-            indent_guides=False,
-        )
-        print(f"\nWINNER PROBABILITIES (%):")
-        pprint(
-            [
-                (user, prob * 100)
-                for user, prob in sorted(
-                    sim_group.winner_prob.items(), key=lambda x: x[1], reverse=True
-                )
-            ],
-            indent_guides=False,
-        )
+    # Only re-simulates when the bracket, ratings, model or entries changed.
+    sim_group = cached_sim_group(
+        group=group, current_bracket=get_bracket(), sim_count=100_000
+    )
+    print(f"\nAVERAGE SCORES:")
+    pprint(
+        sorted(
+            sim_group.user_average_scores.items(), key=lambda x: (x[1]), reverse=True
+        ),
+        indent_guides=False,
+    )
+    print(f"\nWINNER PROBABILITIES (%):")
+    pprint(
+        [
+            (user, prob * 100)
+            for user, prob in sorted(
+                sim_group.winner_prob.items(), key=lambda x: x[1], reverse=True
+            )
+        ],
+        indent_guides=False,
+    )
 
+    if not sim_result_json_path.exists():
         with open(sim_result_json_path, "w") as file:
             file.write(
                 json.dumps(
                     {
+                        "ratings_hash": ratings_hash(get_kenpom_data()),
                         "average_scores": sim_group.user_average_scores,
                         "winner_probabilities": {
                             key: value * 100
@@ -264,7 +405,12 @@ if __name__ == "__main__":
     all_users = sorted([entry.user for entry in group.entries])
     print(f"All users: {all_users}")
 
-    sim_count = 10_000
+    sim_count = 100_000
+    paired = args.paired
+    # Without --paired, one pool of simulations, split by who wins each game.
+    leverage = (
+        None if paired else leverage_report(group, current_bracket, sim_count=sim_count)
+    )
 
     for game in current_bracket.current_round_games():
         team1: Team = current_bracket.teams[game.team1_index]
@@ -272,40 +418,32 @@ if __name__ == "__main__":
         # pprint(game, indent_guides=False)
         # print(f"({team1.seed}) {team1.name} vs ({team2.seed}) {team2.name}")
 
-        results: dict[str, list[float]] = {user: [0, 0] for user in all_users}
-
-        for hypo_index, winner_index in enumerate([game.team1_index, game.team2_index]):
-            winner: Team = current_bracket.teams[winner_index]
-            # print(f"  Assuming: {winner.name} wins:")
-            bracket = current_bracket.clone()
-            bracket.advance_winner(game=game, winner_index=winner_index)
-
-            sim_group = SimGroup(
-                group=group,
-                current_bracket=bracket,
-                sim_count=sim_count,
-                suppress_print=True,
+        # user -> [win % if team1 wins, win % if team2 wins, standard error]
+        results: dict[str, list[float | None]] = {
+            user: [0, 0, None] for user in all_users
+        }
+        if paired:
+            comparison = compare_winners(
+                group, current_bracket, game, sim_count=sim_count
             )
-            # print(f"\nAVERAGE SCORES:")
-            # pprint(
-            #     sorted(sim_group.user_average_scores.items(), key=lambda x: x[1], reverse=True),
-            #     indent_guides=False,
-            # )
-            # print(f"\nWINNER PROBABILITIES (%):")
-            for user, prob in sim_group.winner_prob.items():
-                results[user][hypo_index] = prob * 100
-            # pprint(
-            #     [
-            #         (user, prob * 100)
-            #         for user, prob in
-            #         sorted(sim_group.winner_prob.items(), key=lambda x: x[1], reverse=True)
-            #     ],
-            #     indent_guides=False,
-            # )
+            for user in all_users:
+                results[user] = [
+                    comparison.team1_winner_prob[user] * 100,
+                    comparison.team2_winner_prob[user] * 100,
+                    comparison.standard_error[user] * 100,
+                ]
+        else:
+            for outcome in leverage[game.game_id]:
+                hypo_index = [game.team1_index, game.team2_index].index(
+                    outcome.team_index
+                )
+                for user, prob in outcome.winner_prob.items():
+                    if user is not None:
+                        results[user][hypo_index] = prob * 100
 
         results_tup = sorted(
             [
-                (user, value[0], value[1], value[1] - value[0])
+                (user, value[0], value[1], value[1] - value[0], value[2])
                 for user, value in results.items()
             ],
             key=lambda x: (x[1], x[2]),
@@ -320,16 +458,20 @@ if __name__ == "__main__":
             title=f"({team1.seed}) {team1.name} vs ({team2.seed}) {team2.name}"
             + f"\nHypothetical win % if ...",
             box=box.ROUNDED,
-            caption=f"Based on {sim_count:,} simulations",
+            caption=f"Based on {sim_count:,} {'paired ' if paired else ''}simulations",
         )
         table.add_column("Name")
         table.add_column(f"{team1.name.upper()} wins")
         table.add_column(f"{team2.name.upper()} wins")
         table.add_column("Difference")
-        for user, hypo1, hypo2, diff in results_tup:
+        for user, hypo1, hypo2, diff, error in results_tup:
             user_name = user.split("_")[0].capitalize()
+            error_text = "" if error is None else f" ± {error:.2f}%"
             table.add_row(
-                user_name, f"{hypo1:>6.2f}%", f"{hypo2:>6.2f}%", f"{diff:>6.2f}%"
+                user_name,
+                f"{hypo1:>6.2f}%",
+                f"{hypo2:>6.2f}%",
+                f"{diff:>6.2f}%{error_text}",
             )
         console.print(table)
         print()
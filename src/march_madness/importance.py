@@ -0,0 +1,252 @@
+from collections import Counter
+
+import numpy as np
+
+from march_madness import Bracket
+from march_madness.group import BracketEntry, Group
+from march_madness.scoring import ESPN, ScoringSystem
+from march_madness.vectorized import (
+    BatchSimGroup,
+    BatchSimulation,
+    contestants,
+    pick_matrix,
+    win_shares,
+)
+from march_madness.win_probability import EloStyle, WinProbabilityModel
+
+DEFAULT_TILT = 1.5
+"""Log-odds added in favor of the target. 1.5 turns a 10% underdog into a 33% one."""
+
+
+def team_target(bracket: Bracket, team_index: int) -> np.ndarray:
+    """Favor one team in every game it plays."""
+    return np.full(len(bracket.games), team_index, dtype=np.int8)
+
+
+def entry_target(entry: BracketEntry) -> np.ndarray:
+    """Favor an entry's pick in every game, e.g. to study a long shot winning the pool."""
+    return pick_matrix([entry])[0]
+
+
+def tilt_probabilities(probabilities: np.ndarray, tilt: float) -> np.ndarray:
+    """Add `tilt` to the log-odds of each probability."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        odds = probabilities / (1 - probabilities) * np.exp(tilt)
+        return np.where(probabilities >= 1, 1.0, odds / (1 + odds))
+
+
+def simulate_tilted_outcomes(
+    bracket: Bracket,
+    probabilities: np.ndarray,
+    sim_count: int,
+    favored: np.ndarray,
+    tilt: float = DEFAULT_TILT,
+    rng: np.random.Generator | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Like `simulate_outcomes`, but raises the log-odds of `favored[game_id]` by `tilt`.
+
+    Returns the outcomes and each simulation's likelihood ratio (its probability
+    under `probabilities` over its probability as drawn), so that weighted averages
+    estimate the untilted probabilities."""
+    rng = rng or np.random.default_rng()
+    outcomes = np.full((sim_count, len(bracket.games)), -1, dtype=np.int8)
+    log_weights = np.zeros(sim_count)
+
+    for game_ids in bracket.topology().rounds:
+        undecided = []
+        for game_id in game_ids:
+            winner_index = bracket.games[game_id].winner_index
+            if winner_index is None:
+                undecided.append(game_id)
+            else:
+                outcomes[:, game_id] = winner_index
+        if undecided:
+            team1 = contestants(bracket, outcomes, undecided, side=0)
+            team2 = contestants(bracket, outcomes, undecided, side=1)
+            team1_win_prob = probabilities[team1, team2]
+            tilted_team1_win_prob = np.select(
+                [team1 == favored[undecided], team2 == favored[undecided]],
+                [
+                    tilt_probabilities(team1_win_prob, tilt),
+                    tilt_probabilities(team1_win_prob, -tilt),
+                ],
+                team1_win_prob,
+            )
+            team1_wins = rng.random(team1_win_prob.shape) < tilted_team1_win_prob
+            outcomes[:, undecided] = np.where(team1_wins, team1, team2)
+            # Both branches are evaluated, and the one not taken is -inf - -inf
+            # for games a 0/1 model has already decided.
+            with np.errstate(divide="ignore", invalid="ignore"):
+                log_weights += np.where(
+                    team1_wins,
+                    np.log(team1_win_prob) - np.log(tilted_team1_win_prob),
+                    np.log1p(-team1_win_prob) - np.log1p(-tilted_team1_win_prob),
+                ).sum(axis=1)
+    return outcomes, np.exp(log_weights)
+
+
+def effective_sample_size(weights: np.ndarray) -> float:
+    """How many unweighted simulations the weighted ones are worth."""
+    return float(weights.sum() ** 2 / np.square(weights).sum())
+
+
+class ImportanceSimulation(BatchSimulation):
+    """`BatchSimulation` that oversamples `favored` winning, then reweights.
+
+    `_results` holds summed likelihood ratios instead of counts, so `results()` still
+    estimates each team's chance of winning each game."""
+
+    def __init__(
+        self,
+        *,
+        bracket: Bracket,
+        favored: np.ndarray,
+        tilt: float = DEFAULT_TILT,
+        model: WinProbabilityModel = EloStyle(),
+        sim_count: int = 100,
+        seed: int | None = None,
+        suppress_print: bool = False,
+    ):
+        self.favored = favored
+        self.tilt = tilt
+        self.weights: np.ndarray | None = None
+        """Likelihood ratio of each simulation."""
+        super().__init__(
+            bracket=bracket,
+            model=model,
+            sim_count=sim_count,
+            seed=seed,
+            suppress_print=suppress_print,
+        )
+
+    @property
+    def effective_sample_size(self) -> float:
+        return effective_sample_size(self.weights)
+
+    def _do_sim(self) -> None:
+        if not self._suppress_print:
+            print(f"Simulating {self.sim_count:,} tilted brackets")
+        self.outcomes, self.weights = simulate_tilted_outcomes(
+            self.bracket,
+            self.model.matrix(self.bracket),
+            self.sim_count,
+            self.favored,
+            self.tilt,
+            rng=np.random.default_rng(self.seed),
+        )
+        self._results = {}
+        for game_id in range(len(self.bracket.games)):
+            weights = np.bincount(
+                self.outcomes[:, game_id],
+                weights=self.weights,
+                minlength=len(self.bracket.teams),
+            )
+            self._results[game_id] = Counter(
+                {int(index): float(weights[index]) for index in np.flatnonzero(weights)}
+            )
+
+
+class ImportanceSimGroup(BatchSimGroup):
+    """`BatchSimGroup` that oversamples `favored` winning, then reweights.
+
+    Useful when a user's chance of winning is too small to estimate from plain
+    simulations: favor their picks with `entry_target(entry)`."""
+
+    def __init__(
+        self,
+        group: Group,
+        current_bracket: Bracket,
+        favored: np.ndarray,
+        tilt: float = DEFAULT_TILT,
+        sim_count: int = 100,
+        suppress_print: bool = False,
+        seed: int | None = None,
+        model: WinProbabilityModel = EloStyle(),
+        scoring: ScoringSystem = ESPN,
+    ) -> None:
+        self.favored = favored
+        self.tilt = tilt
+        self.weights: np.ndarray | None = None
+        """Likelihood ratio of each simulation."""
+        super().__init__(
+            group=group,
+            current_bracket=current_bracket,
+            sim_count=sim_count,
+            suppress_print=suppress_print,
+            seed=seed,
+            model=model,
+            scoring=scoring,
+        )
+
+    @property
+    def effective_sample_size(self) -> float:
+        return effective_sample_size(self.weights)
+
+    def _do_sim(self):
+        sim = ImportanceSimulation(
+            bracket=self.current_bracket,
+            favored=self.favored,
+            tilt=self.tilt,
+            model=self.model,
+            sim_count=self.sim_count,
+            seed=self.seed,
+            suppress_print=self._suppress_print,
+        )
+        self.outcomes = sim.outcomes
+        self.weights = sim.weights
+        self.scores = self._score(self.outcomes)
+        self._tally()
+
+    def _tally(self) -> None:
+        total_scores = self.weights @ self.scores
+        shares = win_shares(self.scores)
+        wins = self.weights @ shares
+        self._winner_counter.clear()
+        for index, entry in enumerate(self.group.entries):
+            self._user_total_scores[entry.user] = float(total_scores[index])
+            if wins[index]:
+                self._winner_counter[entry.user] = float(wins[index])
+        no_winner = ~shares.any(axis=1)
+        if np.any(no_winner):
+            self._winner_counter[None] = float(self.weights[no_winner].sum())
+        self._summarize()
+
+
+if __name__ == "__main__":
+    from march_madness import get_bracket
+    from march_madness.enumeration import exact_group_results
+
+    bracket = get_bracket()
+    for game in bracket.games[48:]:
+        game.winner_index = None
+        if game.round_of < 16:
+            game.team1_index = game.team2_index = None
+
+    group = Group.load()
+    exact = exact_group_results(group, bracket)
+    long_shot = min(
+        (entry for entry in group.entries if exact.winner_prob[entry.user] > 0),
+        key=lambda entry: exact.winner_prob[entry.user],
+    )
+    plain = BatchSimGroup(
+        group=group,
+        current_bracket=bracket,
+        sim_count=10_000,
+        seed=1,
+        suppress_print=True,
+    )
+    tilted = ImportanceSimGroup(
+        group=group,
+        current_bracket=bracket,
+        favored=entry_target(long_shot),
+        sim_count=10_000,
+        seed=1,
+        suppress_print=True,
+    )
+    print(f"Chance {long_shot.user} wins the group:")
+    print(f"  Exact (ties split): {exact.winner_prob[long_shot.user] * 100:.3f}%")
+    print(f"  Plain:  {plain.winner_prob.get(long_shot.user, 0) * 100:.3f}%")
+    print(
+        f"  Tilted: {tilted.winner_prob.get(long_shot.user, 0) * 100:.3f}% "
+        f"(effective sample size {tilted.effective_sample_size:,.0f})"
+    )
@@ -0,0 +1,132 @@
+import numpy as np
+
+from march_madness import Bracket, Game
+from march_madness.group import Group
+from march_madness.kenpom import update_bracket_kenpoms
+from march_madness.scoring import ESPN, ScoringSystem
+from march_madness.vectorized import BatchSimGroup, simulate_outcomes
+from march_madness.win_probability import EloStyle, WinProbabilityModel
+
+
+class IncrementalSimGroup(BatchSimGroup):
+    """A `BatchSimGroup` that keeps its samples and updates them as games finish.
+
+    When a real result comes in, the simulations that already had that winner are
+    kept: conditioned on the result, they are still draws from the right
+    distribution, so they keep their equal weight. Only the simulations that got
+    the game wrong are replaced, with fresh simulations of the updated bracket.
+
+    Results and ratings go into a copy of `current_bracket`, so the caller's bracket
+    is left as it was."""
+
+    def __init__(
+        self,
+        group: Group,
+        current_bracket: Bracket,
+        sim_count: int = 100,
+        suppress_print: bool = False,
+        seed: int | None = None,
+        model: WinProbabilityModel = EloStyle(),
+        scoring: ScoringSystem = ESPN,
+    ) -> None:
+        self._rng = np.random.default_rng(
+            None if seed is None else np.random.SeedSequence(seed).spawn(1)[0]
+        )
+        """Draws the top-up simulations, separately from the initial pool."""
+        self.kept_share: float = 1.0
+        """Share of simulations kept by the last `advance_winner`."""
+        super().__init__(
+            group=group,
+            current_bracket=current_bracket.clone(),
+            sim_count=sim_count,
+            suppress_print=suppress_print,
+            seed=seed,
+            model=model,
+            scoring=scoring,
+        )
+
+    def results(self, game_id: int) -> list[tuple[str, float]]:
+        """Same as `Simulation.results`, from the current samples."""
+        counts = np.bincount(
+            self.outcomes[:, game_id], minlength=len(self.current_bracket.teams)
+        )
+        team_indexes = sorted(np.flatnonzero(counts), key=lambda index: -counts[index])
+        return [
+            (
+                self.current_bracket.teams[index].name,
+                float(counts[index] / self.sim_count),
+            )
+            for index in team_indexes
+        ]
+
+    def advance_winner(self, game: Game, winner_index: int) -> None:
+        """Record a real result in `current_bracket` (this group's copy) and update
+        the samples."""
+        self.current_bracket.advance_winner(game, winner_index)
+
+        replace = self.outcomes[:, game.game_id] != winner_index
+        replace_count = int(replace.sum())
+        self.kept_share = 1 - replace_count / self.sim_count
+        if replace_count:
+            fresh_outcomes = simulate_outcomes(
+                self.current_bracket,
+                self.model.matrix(self.current_bracket),
+                replace_count,
+                rng=self._rng,
+            )
+            self.outcomes[replace] = fresh_outcomes
+            self.scores[replace] = self._score(fresh_outcomes)
+        self._tally()
+
+    def update_ratings(self, kenpom_data: dict[str, float]) -> list[int]:
+        """Apply new ratings to `current_bracket` and re-simulate if any changed.
+
+        Only the win probabilities involving the changed teams are recomputed.
+        Returns the indexes of those teams."""
+        bracket = self.current_bracket
+        changed = [
+            index
+            for index, team in enumerate(bracket.teams)
+            if team.kenpom != kenpom_data[team.kenpom_id]
+        ]
+        if not changed:
+            return changed
+        previous = self.model.matrix(bracket)
+        update_bracket_kenpoms(bracket, kenpom_data)
+        matrix = self.model.update_matrix(bracket, previous, changed)
+        self.outcomes = simulate_outcomes(
+            bracket, matrix, self.sim_count, rng=self._rng
+        )
+        self.scores = self._score(self.outcomes)
+        self._tally()
+        return changed
+
+
+if __name__ == "__main__":
+    import time
+
+    from rich.pretty import pprint
+
+    from march_madness import get_bracket
+
+    # Replay the Elite Eight from the Sweet 16 results.
+    actual_bracket = get_bracket()
+    bracket = actual_bracket.clone()
+    for game in bracket.games[56:]:
+        game.winner_index = None
+        if game.round_of < 8:
+            game.team1_index = game.team2_index = None
+
+    sim_group = IncrementalSimGroup(
+        group=Group.load(), current_bracket=bracket, sim_count=100_000, seed=40351
+    )
+    for game in actual_bracket.games[56:60]:
+        start = time.monotonic()
+        sim_group.advance_winner(game, game.winner_index)
+        winner = bracket.teams[game.winner_index]
+        print(
+            f"{winner.name} wins game {game.game_id}: kept "
+            f"{sim_group.kept_share * 100:.1f}% of samples, "
+            f"updated in {(time.monotonic() - start) * 1000:.1f}ms"
+        )
+        pprint(sim_group.winner_prob, indent_guides=False)
@@ -2,11 +2,12 @@ from __future__ import annotations
 
 import json
 from pathlib import Path
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from bs4 import BeautifulSoup
 from typing import TYPE_CHECKING
 
+from march_madness.kenpom_fetch import BrowserSource, FetchResult, RatingsFetcher
+from march_madness.kenpom_table import KenPomParseError, KenPomTable, parse_ratings_file
+from march_madness.ratings_history import default_history
+
 if TYPE_CHECKING:
     from march_madness import Bracket
 
@@ -14,70 +15,69 @@ known_good_html_path = Path("data/kenpom/known_good.html")
 latest_html_path = Path("data/kenpom/latest.html")
 known_good_json_path = Path("data/kenpom/known_good.json")
 
+_kenpom_cache: dict[Path, tuple[tuple[int, int], dict[str, float]]] = {}
+"""Ratings by file, with the (mtime, size) they were read at."""
+
 # URL of the webpage containing the table
 url = "https://kenpom.com/"
 
+_fetcher: RatingsFetcher | None = None
 
-def download_html_from_url() -> None:
-    """Get the HTML content save it to `latest_html_path`."""
-    print(f"Downloading HTML from {url}")
-    # Set up the WebDriver (e.g., Chrome)
-    options = Options()
-    # options.add_argument('--headless')
-    # options.add_argument('--disable-gpu')  # Disable GPU acceleration
-    # options.add_argument('--no-sandbox')   # Bypass OS security model
-    # options.add_argument('--disable-dev-shm-usage')  # Overcome limited resource problems
 
-    driver = webdriver.Chrome(options=options)
+def default_fetcher() -> RatingsFetcher:
+    """The fetcher `update_all_from_website` uses, kept for the whole process so the
+    browser starts only once."""
+    global _fetcher
+    if _fetcher is None:
+        _fetcher = RatingsFetcher(BrowserSource(url))
+    return _fetcher
 
-    # Open the webpage
-    driver.get(url)
 
-    # Get the page source
-    html = driver.page_source
+def download_html_from_url(fetcher: RatingsFetcher | None = None) -> FetchResult:
+    """Fetch the page and save it to `latest_html_path` if it changed."""
+    fetcher = fetcher or default_fetcher()
+    print(f"Downloading HTML from {fetcher.source.url}")
+    result = fetcher.fetch()
+    if result.changed:
+        with open(latest_html_path, "w", encoding="utf-8") as file:
+            file.write(result.html)
+        print(f"HTML saved to {latest_html_path}")
+    return result
 
-    # Close the WebDriver
-    driver.quit()
-    # Save the HTML content to the latest_html_path
-    with open(latest_html_path, "w", encoding="utf-8") as file:
-        file.write(html)
-    print(f"HTML saved to {latest_html_path}")
+
+def parse_html(path: Path) -> dict[str, float]:
+    """Parse the HTML content of the file at the path into team name -> AdjEM.
+
+    Raises `KenPomParseError` saying which row and column didn't parse. See
+    `parse_ratings_file` for the other columns."""
+    return parse_ratings_file(path).ratings()
 
 
-def parse_html(path: Path) -> dict[str, float] | None:
-    """Attempt Parse the HTML content of the file at the path."""
+def update_all_from_website(fetcher: RatingsFetcher | None = None) -> bool:
+    """Save new ratings if the page changed. Returns whether it did."""
     try:
-        with open(path, "r", encoding="utf-8") as file:
-            html = file.read()
-        soup = BeautifulSoup(html, "html.parser")
-
-        table = soup.find("table", id="ratings-table")
-
-        name_to_kenpom = {}
-
-        for row in table.find_all("tr"):
-            cells = row.find_all("td")
-            if len(cells) > 0:
-                names = cells[1].find("a").text
-                kenpom = float(cells[4].text)
-                name_to_kenpom[names] = kenpom
-                # rows.append([cell.text for cell in cells])
-        return name_to_kenpom
-    except Exception:
-        return None
-
-
-def update_all_from_website():
-    download_html_from_url()
-    latest = parse_html(latest_html_path)
-    if latest is not None:
-        print("New data found and successfully parsed.")
-        with open(known_good_json_path, "w", encoding="utf-8") as file:
-            file.write(json.dumps(latest, indent=4))
-        with open(known_good_html_path, "w", encoding="utf-8") as file:
-            file.write(latest_html_path.read_text())
-    else:
-        print("Unable to get new data for some reason.")
+        result = download_html_from_url(fetcher)
+    except KenPomParseError as error:
+        print(f"Unable to parse the downloaded page: {error}")
+        return False
+    if not result.changed:
+        print("No new data found.")
+        return False
+    print("New data found and successfully parsed.")
+    save_ratings(result.table, result.html)
+    return True
+
+
+def save_ratings(table: KenPomTable, html: str) -> dict[str, float]:
+    """Make `table` (parsed from `html`) the known good ratings, and add them to the
+    ratings history."""
+    ratings = table.ratings()
+    default_history().add(ratings)
+    with open(known_good_json_path, "w", encoding="utf-8") as file:
+        file.write(json.dumps(ratings, indent=4))
+    with open(known_good_html_path, "w", encoding="utf-8") as file:
+        file.write(html)
+    return ratings
     # known_good = parse_html(known_good_html_path)
 
     # if latest and known_good:
@@ -93,18 +93,36 @@ def update_all_from_website():
     #     print("Error parsing HTML")
 
 
-def get_kenpom_data() -> dict[str, float]:
-    """Get the kenpom data from the known_good_json_path."""
-    with open(known_good_json_path, "r", encoding="utf-8") as file:
-        return json.load(file)
+def get_kenpom_data(path: Path = known_good_json_path) -> dict[str, float]:
+    """Get the kenpom data from the known_good_json_path.
 
+    The file is read once per process, and again only when its mtime or size
+    changes. The dict is shared between callers, so don't modify it."""
+    stat = path.stat()
+    version = (stat.st_mtime_ns, stat.st_size)
+    cached = _kenpom_cache.get(path)
+    if cached is None or cached[0] != version:
+        with open(path, "r", encoding="utf-8") as file:
+            cached = (version, json.load(file))
+        _kenpom_cache[path] = cached
+    return cached[1]
 
-def update_bracket_kenpoms(bracket: Bracket):
-    kenpom_data = get_kenpom_data()
+
+def update_bracket_kenpoms(
+    bracket: Bracket, kenpom_data: dict[str, float] | None = None
+):
+    """Set each team's rating from `kenpom_data`, by default the latest saved."""
+    kenpom_data = kenpom_data if kenpom_data is not None else get_kenpom_data()
+    changed = False
     for team in bracket.teams:
         # kenpom = kenpom_data.get(team.kenpom_id)
         # print(f"Updating {team.name} to {kenpom=}")
-        team.kenpom = kenpom_data[team.kenpom_id]
+        kenpom = kenpom_data[team.kenpom_id]
+        if team.kenpom != kenpom:
+            team.kenpom = kenpom
+            changed = True
+    if changed:
+        bracket.clear_win_probabilities()
 
     # for game in bracket.games:
     #     for team in [game.team1, game.team2]:
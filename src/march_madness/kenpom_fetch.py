@@ -0,0 +1,255 @@
+import abc
+import email.utils
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import NamedTuple
+
+import requests
+
+from march_madness.kenpom_table import KenPomTable, parse_ratings_html
+
+
+class SourceResponse(NamedTuple):
+    """What a `RatingsSource` returned for one fetch."""
+
+    html: str | None
+    """The page, or None if it hasn't changed since the `etag`/`last_modified` sent."""
+    etag: str | None = None
+    last_modified: str | None = None
+
+
+class RatingsSource(abc.ABC):
+    """Where the ratings page comes from. Subclasses implement `fetch`, and keep
+    whatever connection or browser they need open until `close`."""
+
+    url: str
+
+    @abc.abstractmethod
+    def fetch(
+        self, etag: str | None = None, last_modified: str | None = None
+    ) -> SourceResponse:
+        """The page, or no page if it hasn't changed since `etag`/`last_modified`."""
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class HttpSource(RatingsSource):
+    """Plain GETs over one keep-alive `requests.Session`.
+
+    Sends `If-None-Match`/`If-Modified-Since`, so an unchanged page costs a 304 and
+    no download."""
+
+    def __init__(
+        self,
+        url: str,
+        timeout: float = 30.0,
+        session: requests.Session | None = None,
+    ):
+        self.url = url
+        self.timeout = timeout
+        self.session = session or requests.Session()
+
+    def fetch(
+        self, etag: str | None = None, last_modified: str | None = None
+    ) -> SourceResponse:
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        response = self.session.get(self.url, headers=headers, timeout=self.timeout)
+        if response.status_code == 304:
+            return SourceResponse(None, etag, last_modified)
+        response.raise_for_status()
+        return SourceResponse(
+            response.text,
+            response.headers.get("ETag"),
+            response.headers.get("Last-Modified"),
+        )
+
+    def close(self) -> None:
+        self.session.close()
+
+
+class BrowserSource(RatingsSource):
+    """One Chrome (headless by default), started on the first fetch and reused until
+    `close`, for pages that only load in a real browser.
+
+    A browser can't send conditional requests, so every fetch downloads the page;
+    `RatingsFetcher` still skips parsing it when it hasn't changed."""
+
+    def __init__(self, url: str, headless: bool = True):
+        self.url = url
+        self.headless = headless
+        self._driver = None
+
+    def fetch(
+        self, etag: str | None = None, last_modified: str | None = None
+    ) -> SourceResponse:
+        if self._driver is None:
+            from selenium import webdriver
+            from selenium.webdriver.chrome.options import Options
+
+            options = Options()
+            if self.headless:
+                options.add_argument("--headless=new")
+                options.add_argument("--disable-gpu")
+                options.add_argument("--no-sandbox")
+                options.add_argument("--disable-dev-shm-usage")
+            self._driver = webdriver.Chrome(options=options)
+        self._driver.get(self.url)
+        return SourceResponse(self._driver.page_source)
+
+    def close(self) -> None:
+        if self._driver is not None:
+            self._driver.quit()
+            self._driver = None
+
+
+class FetchResult(NamedTuple):
+    changed: bool
+    """Whether the page differs from the last one fetched."""
+    not_modified: bool
+    """Whether the source said so without sending the page (a 304)."""
+    html: str | None
+    """The page, if it changed."""
+    table: KenPomTable | None
+    """The parsed ratings, if the page changed."""
+
+
+class RatingsFetcher:
+    """Fetches the ratings page from `source` and parses it only when it changed.
+
+    Keep one fetcher for repeated refreshes: it remembers the `ETag`, `Last-Modified`
+    and body hash of the last page it parsed."""
+
+    def __init__(self, source: RatingsSource):
+        self.source = source
+        self.etag: str | None = None
+        self.last_modified: str | None = None
+        self.body_hash: str | None = None
+
+    def fetch(self) -> FetchResult:
+        """Raises `KenPomParseError` if a changed page doesn't parse. The page is then
+        parsed again on the next fetch."""
+        response = self.source.fetch(self.etag, self.last_modified)
+        if response.html is None:
+            return FetchResult(False, True, None, None)
+        body_hash = hashlib.sha256(response.html.encode()).hexdigest()
+        if body_hash == self.body_hash:
+            return FetchResult(False, False, None, None)
+
+        table = parse_ratings_html(response.html)
+        self.etag = response.etag
+        self.last_modified = response.last_modified
+        self.body_hash = body_hash
+        return FetchResult(True, False, response.html, table)
+
+    def close(self) -> None:
+        self.source.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class StubRatingsServer(ThreadingHTTPServer):
+    """Local HTTP server for a saved ratings page, as a stand-in for kenpom.com.
+
+    The file is read on every request, so it can be changed between fetches. Sends
+    an `ETag` (hash of the body) and `Last-Modified` (file mtime), and answers
+    matching conditional requests with a 304. Runs on a background thread; use as a
+    context manager."""
+
+    def __init__(self, path: Path, host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), _StubHandler)
+        self.path = Path(path)
+        self.request_count = 0
+        self.not_modified_count = 0
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    server: StubRatingsServer
+
+    def do_GET(self) -> None:
+        self.server.request_count += 1
+        body = self.server.path.read_bytes()
+        etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+        mtime = int(self.server.path.stat().st_mtime)
+        last_modified = email.utils.formatdate(mtime, usegmt=True)
+
+        if_none_match = self.headers.get("If-None-Match")
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_none_match is not None:
+            not_modified = if_none_match == etag
+        elif if_modified_since is not None:
+            since = email.utils.parsedate_to_datetime(if_modified_since).timestamp()
+            not_modified = mtime <= since
+        else:
+            not_modified = False
+
+        if not_modified:
+            self.server.not_modified_count += 1
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", last_modified)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+if __name__ == "__main__":
+    import time
+
+    from march_madness.kenpom import known_good_html_path
+
+    with StubRatingsServer(known_good_html_path) as server:
+        with RatingsFetcher(HttpSource(server.url)) as fetcher:
+            for refresh in range(3):
+                start = time.perf_counter()
+                result = fetcher.fetch()
+                elapsed = time.perf_counter() - start
+                if result.changed:
+                    status = f"parsed {len(result.table.team)} teams"
+                elif result.not_modified:
+                    status = "not modified (304)"
+                else:
+                    status = "unchanged"
+                print(f"Refresh {refresh}: {status} in {elapsed * 1000:.1f} ms")
+        print(
+            f"{server.request_count} requests, "
+            f"{server.not_modified_count} answered with 304"
+        )
@@ -0,0 +1,267 @@
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Iterable, Iterator, NamedTuple
+
+import numpy as np
+
+RATINGS_TABLE_ID = "ratings-table"
+CELLS_PER_ROW = 21
+"""Rank, team, conference, W-L, AdjEM, then 8 (value, rank) pairs."""
+CHUNK_SIZE = 64 * 1024
+
+FLOAT_COLUMNS = {
+    "adj_em": 4,
+    "adj_o": 5,
+    "adj_d": 7,
+    "adj_t": 9,
+    "luck": 11,
+    "sos": 13,
+    "sos_o": 15,
+    "sos_d": 17,
+    "ncsos": 19,
+}
+"""Column name -> index of the `td` holding it. The `td` after each is its rank."""
+
+
+class KenPomParseError(ValueError):
+    """A ratings table that doesn't look like KenPom's.
+
+    `row` is the 1-based team row in the table, `column` the column name and `line`
+    the line of the HTML the row started on, where they are known."""
+
+    def __init__(
+        self,
+        message: str,
+        row: int | None = None,
+        column: str | None = None,
+        line: int | None = None,
+    ):
+        location = []
+        if row is not None:
+            location.append(f"row {row}")
+        if column is not None:
+            location.append(f"column {column!r}")
+        if line is not None:
+            location.append(f"line {line}")
+        super().__init__(f"{', '.join(location)}: {message}" if location else message)
+        self.row = row
+        self.column = column
+        self.line = line
+
+
+class KenPomTable(NamedTuple):
+    """The KenPom ratings table, one entry per team in ranking order."""
+
+    team: list[str]
+    conference: list[str]
+    rank: np.ndarray
+    seed: np.ndarray
+    """Tournament seed, or 0 if the team isn't in the tournament."""
+    wins: np.ndarray
+    losses: np.ndarray
+    adj_em: np.ndarray
+    """Adjusted efficiency margin, the rating the simulations use."""
+    adj_o: np.ndarray
+    adj_d: np.ndarray
+    adj_t: np.ndarray
+    luck: np.ndarray
+    sos: np.ndarray
+    sos_o: np.ndarray
+    sos_d: np.ndarray
+    ncsos: np.ndarray
+
+    def ratings(self) -> dict[str, float]:
+        """Team name -> AdjEM, the format of `known_good.json`."""
+        return dict(zip(self.team, self.adj_em.tolist()))
+
+
+class _RatingsTableParser(HTMLParser):
+    """Collects the text of each `td` of `#ratings-table` and ignores the rest."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.rows: list[tuple[int, list[str], str]] = []
+        """`(line, cell texts, seed)` of each row with any `td`s."""
+        self.found_table = False
+        self.done = False
+        self._table_depth = 0
+        self._row: list[str] | None = None
+        self._row_line = 0
+        self._cell: list[str] | None = None
+        self._seed: list[str] = []
+        self._in_seed = False
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if self.done:
+            return
+        if tag == "table":
+            if self._table_depth:
+                self._table_depth += 1
+            elif ("id", RATINGS_TABLE_ID) in attrs:
+                self.found_table = True
+                self._table_depth = 1
+            return
+        if self._table_depth != 1:
+            return
+        if tag == "tr":
+            self._end_row()
+            self._row = []
+            self._row_line = self.getpos()[0]
+        elif tag == "td" and self._row is not None:
+            self._end_cell()
+            self._cell = []
+        elif tag == "span" and self._cell is not None and len(self._row) == 1:
+            # The team's seed, after its name.
+            self._in_seed = ("class", "seed") in attrs
+
+    def handle_endtag(self, tag: str) -> None:
+        if not self._table_depth:
+            return
+        if tag == "table":
+            self._table_depth -= 1
+            if not self._table_depth:
+                self._end_row()
+                self.done = True
+        elif self._table_depth != 1:
+            return
+        elif tag == "span":
+            self._in_seed = False
+        elif tag == "td":
+            self._end_cell()
+        elif tag == "tr":
+            self._end_row()
+
+    def handle_data(self, data: str) -> None:
+        if self._cell is None:
+            return
+        if self._in_seed:
+            self._seed.append(data)
+        else:
+            self._cell.append(data)
+
+    def _end_cell(self) -> None:
+        if self._cell is not None:
+            self._row.append("".join(self._cell).strip())
+            self._cell = None
+            self._in_seed = False
+
+    def _end_row(self) -> None:
+        self._end_cell()
+        if self._row:
+            self.rows.append((self._row_line, self._row, "".join(self._seed).strip()))
+        self._row = None
+        self._seed = []
+
+
+def parse_ratings_chunks(chunks: Iterable[str]) -> KenPomTable:
+    """Parse KenPom's ratings page, given as pieces of HTML.
+
+    Rows are collected as the HTML streams in, and nothing after the end of
+    `#ratings-table` is read."""
+    parser = _RatingsTableParser()
+    for chunk in chunks:
+        parser.feed(chunk)
+        if parser.done:
+            break
+    else:
+        parser.close()
+    if not parser.found_table:
+        raise KenPomParseError(f"No table with id {RATINGS_TABLE_ID!r}")
+    if not parser.rows:
+        raise KenPomParseError(f"No teams in #{RATINGS_TABLE_ID}")
+    return _build_table(parser.rows)
+
+
+def parse_ratings_html(html: str, chunk_size: int = CHUNK_SIZE) -> KenPomTable:
+    return parse_ratings_chunks(
+        html[start : start + chunk_size] for start in range(0, len(html), chunk_size)
+    )
+
+
+def parse_ratings_file(path: Path, chunk_size: int = CHUNK_SIZE) -> KenPomTable:
+    with open(path, "r", encoding="utf-8") as file:
+        return parse_ratings_chunks(_read_chunks(file, chunk_size))
+
+
+def _read_chunks(file, chunk_size: int) -> Iterator[str]:
+    while chunk := file.read(chunk_size):
+        yield chunk
+
+
+def _build_table(rows: list[tuple[int, list[str], str]]) -> KenPomTable:
+    team_count = len(rows)
+    columns = {name: np.empty(team_count) for name in FLOAT_COLUMNS}
+    rank = np.empty(team_count, dtype=np.int16)
+    seed = np.zeros(team_count, dtype=np.int8)
+    wins = np.empty(team_count, dtype=np.int16)
+    losses = np.empty(team_count, dtype=np.int16)
+    team = []
+    conference = []
+
+    for row_index, (line, cells, seed_text) in enumerate(rows):
+        row = row_index + 1
+        if len(cells) != CELLS_PER_ROW:
+            raise KenPomParseError(
+                f"Expected {CELLS_PER_ROW} cells, found {len(cells)}",
+                row=row,
+                line=line,
+            )
+
+        def parse(column: str, text: str, kind: type = float):
+            try:
+                return kind(text)
+            except ValueError:
+                raise KenPomParseError(
+                    f"Expected {kind.__name__}, found {text!r}",
+                    row=row,
+                    column=column,
+                    line=line,
+                ) from None
+
+        rank[row_index] = parse("rank", cells[0], int)
+        if not cells[1]:
+            raise KenPomParseError(
+                "Missing team name", row=row, column="team", line=line
+            )
+        team.append(cells[1])
+        if seed_text:
+            seed[row_index] = parse("seed", seed_text, int)
+        conference.append(cells[2])
+        win_text, _, loss_text = cells[3].partition("-")
+        wins[row_index] = parse("wins", win_text, int)
+        losses[row_index] = parse("losses", loss_text, int)
+        for name, cell_index in FLOAT_COLUMNS.items():
+            columns[name][row_index] = parse(name, cells[cell_index])
+
+    return KenPomTable(
+        team=team,
+        conference=conference,
+        rank=rank,
+        seed=seed,
+        wins=wins,
+        losses=losses,
+        **columns,
+    )
+
+
+if __name__ == "__main__":
+    import time
+
+    from march_madness.kenpom import known_good_html_path
+
+    table = parse_ratings_file(known_good_html_path)
+    for index in range(5):
+        print(
+            f"{table.rank[index]:>3} {table.team[index]:<16} "
+            f"AdjEM {table.adj_em[index]:+6.2f}  AdjO {table.adj_o[index]:5.1f}  "
+            f"AdjD {table.adj_d[index]:5.1f}  AdjT {table.adj_t[index]:4.1f}  "
+            f"Luck {table.luck[index]:+.3f}  SOS {table.sos[index]:+6.2f}"
+        )
+
+    html = known_good_html_path.read_text(encoding="utf-8")
+    count = 20
+    start = time.perf_counter()
+    for _ in range(count):
+        parse_ratings_html(html)
+    elapsed = (time.perf_counter() - start) / count
+    print(f"\nParsed {len(table.team)} teams in {elapsed * 1000:.1f} ms")
@@ -0,0 +1,85 @@
+from typing import NamedTuple
+
+import numpy as np
+
+from march_madness import Bracket
+from march_madness.group import Group
+from march_madness.scoring import ESPN, ScoringSystem
+from march_madness.vectorized import BatchSimGroup, win_shares
+from march_madness.win_probability import EloStyle, WinProbabilityModel
+
+
+class OutcomeLeverage(NamedTuple):
+    """Group win probabilities given that one team wins one undecided game."""
+
+    game_id: int
+    team_index: int
+    probability: float
+    """Share of simulations where the team won the game."""
+    sample_count: int
+    winner_prob: dict[str | None, float]
+    """Chance of each user winning the group, given this outcome. Ties are split."""
+
+
+def leverage_report(
+    group: Group,
+    bracket: Bracket,
+    sim_count: int = 100_000,
+    *,
+    model: WinProbabilityModel = EloStyle(),
+    seed: int | None = None,
+    suppress_print: bool = True,
+    scoring: ScoringSystem = ESPN,
+) -> dict[int, list[OutcomeLeverage]]:
+    """How each possible result of every undecided game changes who wins the group.
+
+    Runs one pool of `sim_count` simulations and splits it by who won each game,
+    instead of re-simulating with each game's winner forced. Keyed by game id, with
+    the likeliest winner first."""
+    sim_group = BatchSimGroup(
+        group=group,
+        current_bracket=bracket,
+        sim_count=sim_count,
+        suppress_print=suppress_print,
+        seed=seed,
+        model=model,
+        scoring=scoring,
+    )
+    users = [entry.user for entry in group.entries] + [None]
+    shares = win_shares(sim_group.scores)
+    # The last "user", None, gets the simulations nobody won.
+    shares = np.column_stack([shares, ~shares.any(axis=1)])
+    num_teams = len(bracket.teams)
+
+    report = {}
+    for game in bracket.undecided_games():
+        game_winners = sim_group.outcomes[:, game.game_id]
+        team_counts = np.bincount(game_winners, minlength=num_teams)
+        # Sum each user's share of the group wins by who won the game.
+        pair_counts = np.column_stack(
+            [
+                np.bincount(game_winners, weights=user_shares, minlength=num_teams)
+                for user_shares in shares.T
+            ]
+        )
+
+        outcomes = []
+        for team_index in np.argsort(-team_counts, kind="stable"):
+            sample_count = int(team_counts[team_index])
+            if not sample_count:
+                break
+            outcomes.append(
+                OutcomeLeverage(
+                    game_id=game.game_id,
+                    team_index=int(team_index),
+                    probability=sample_count / sim_count,
+                    sample_count=sample_count,
+                    winner_prob={
+                        user: float(count / sample_count)
+                        for user, count in zip(users, pair_counts[team_index])
+                        if count
+                    },
+                )
+            )
+        report[game.game_id] = outcomes
+    return report
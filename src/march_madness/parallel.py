@@ -0,0 +1,185 @@
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable
+
+import numpy as np
+
+from march_madness import Bracket, Game, get_bracket
+from march_madness.group import Group, SimGroup
+from march_madness.scoring import ESPN, ScoringSystem
+from march_madness.simulation import elo_style
+from march_madness.simulation2 import Simulation
+
+
+def shard_seeds(seed: int, shard_count: int) -> list[int]:
+    """Independent seed for each shard, derived from the master `seed`."""
+    return [
+        int(child.generate_state(1)[0])
+        for child in np.random.SeedSequence(seed).spawn(shard_count)
+    ]
+
+
+def shard_sim_counts(sim_count: int, shard_count: int) -> list[int]:
+    """Split `sim_count` as evenly as possible, earlier shards taking the remainder."""
+    quotient, remainder = divmod(sim_count, shard_count)
+    return [quotient + (1 if index < remainder else 0) for index in range(shard_count)]
+
+
+def _simulation_shard(
+    bracket: Bracket,
+    sim_game_function: Callable[[Game, Bracket], int],
+    sim_count: int,
+    seed: int,
+) -> dict[int, Counter[int, int]]:
+    simulation = Simulation(
+        bracket=bracket,
+        sim_game_function=sim_game_function,
+        sim_count=sim_count,
+        suppress_print=True,
+        seed=seed,
+    )
+    return simulation._results
+
+
+def _sim_group_shard(
+    group: Group,
+    current_bracket: Bracket,
+    sim_count: int,
+    seed: int,
+    scoring: ScoringSystem,
+) -> tuple[dict[str, float], Counter[str, float]]:
+    sim_group = SimGroup(
+        group=group,
+        current_bracket=current_bracket,
+        sim_count=sim_count,
+        suppress_print=True,
+        seed=seed,
+        scoring=scoring,
+    )
+    return sim_group._user_total_scores, sim_group._winner_counter
+
+
+class ParallelSimulation(Simulation):
+    """`Simulation` split into one shard per worker process.
+
+    Each shard reseeds its worker's `rand` from its own seed, derived from `seed`, so
+    results are reproducible for a given (`seed`, `workers`)."""
+
+    def __init__(
+        self,
+        *,
+        bracket: Bracket,
+        sim_game_function: Callable[[Game, Bracket], int] = elo_style,
+        sim_count: int = 100,
+        seed: int = 40351,
+        workers: int | None = None,
+        suppress_print: bool = False,
+    ):
+        self.workers = workers or os.cpu_count() or 1
+        super().__init__(
+            bracket=bracket,
+            sim_game_function=sim_game_function,
+            sim_count=sim_count,
+            suppress_print=suppress_print,
+            seed=seed,
+        )
+
+    def _do_sim(self) -> None:
+        if not self._suppress_print:
+            print(f"Simulating {self.sim_count:,} brackets on {self.workers} workers")
+        self._results = {game.game_id: Counter() for game in self.bracket.games}
+
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            shard_results = executor.map(
+                _simulation_shard,
+                [self.bracket] * self.workers,
+                [self.sim_game_function] * self.workers,
+                shard_sim_counts(self.sim_count, self.workers),
+                shard_seeds(self.seed, self.workers),
+            )
+            for results in shard_results:
+                for game_id, counter in results.items():
+                    self._results[game_id].update(counter)
+
+
+class ParallelSimGroup(SimGroup):
+    """`SimGroup` split into one shard per worker process. See `ParallelSimulation`."""
+
+    def __init__(
+        self,
+        group: Group,
+        current_bracket: Bracket,
+        sim_count: int = 100,
+        suppress_print: bool = False,
+        seed: int = 40351,
+        workers: int | None = None,
+        scoring: ScoringSystem = ESPN,
+    ) -> None:
+        self.workers = workers or os.cpu_count() or 1
+        super().__init__(
+            group=group,
+            current_bracket=current_bracket,
+            sim_count=sim_count,
+            suppress_print=suppress_print,
+            seed=seed,
+            scoring=scoring,
+        )
+
+    def _do_sim(self):
+        if not self._suppress_print:
+            print(f"Simulating {self.sim_count:,} brackets on {self.workers} workers")
+
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            shard_results = executor.map(
+                _sim_group_shard,
+                [self.group] * self.workers,
+                [self.current_bracket] * self.workers,
+                shard_sim_counts(self.sim_count, self.workers),
+                shard_seeds(self.seed, self.workers),
+                [self.scoring] * self.workers,
+            )
+            for user_total_scores, winner_counter in shard_results:
+                for user, total_score in user_total_scores.items():
+                    self._user_total_scores[user] += total_score
+                self._winner_counter.update(winner_counter)
+        self._summarize()
+
+
+if __name__ == "__main__":
+    import time
+
+    from rich.pretty import pprint
+
+    # Merging the shards must give exactly what one process gets running the
+    # same shards back to back.
+    bracket = get_bracket()
+    for game in bracket.games[48:]:
+        game.winner_index = None
+        if game.round_of < 16:
+            game.team1_index = game.team2_index = None
+    sim_count = 2_000
+    workers = 4
+
+    start = time.monotonic()
+    parallel = ParallelSimulation(
+        bracket=bracket, sim_count=sim_count, seed=1, workers=workers
+    )
+    print(f"Parallel: {time.monotonic() - start:.2f}s")
+
+    expected = {game.game_id: Counter() for game in bracket.games}
+    for shard_sim_count, seed in zip(
+        shard_sim_counts(sim_count, workers), shard_seeds(1, workers)
+    ):
+        shard = Simulation(
+            bracket=bracket, sim_count=shard_sim_count, suppress_print=True, seed=seed
+        )
+        for game_id, counter in shard._results.items():
+            expected[game_id].update(counter)
+    assert parallel._results == expected
+
+    group = Group.load()
+    parallel_group = ParallelSimGroup(
+        group=group, current_bracket=bracket, sim_count=sim_count, workers=workers
+    )
+    pprint(parallel_group.winner_prob)
@@ -0,0 +1,357 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
+
+import numpy as np
+
+from march_madness import Bracket
+from march_madness.group import BracketEntry
+from march_madness.parallel import shard_seeds, shard_sim_counts
+from march_madness.scoring import ESPN, MAX_SEED, ScoringSystem
+from march_madness.vectorized import pick_matrix, simulate_outcomes
+from march_madness.win_probability import EloStyle, WinProbabilityModel
+
+NO_PICK = 255
+"""`EntryPool.picks` value for a game without a pick."""
+PERCENTILE_BINS = 20
+"""5-point percentile bins."""
+ENTRY_BLOCK_SIZE = 8192
+"""Unique entries scored per matrix product."""
+MAX_BLOCK_BYTES = 256_000_000
+"""Roughly the most working memory one block of simulations x unique entries uses."""
+
+
+class EntryPool(NamedTuple):
+    """A large pool of entries, stored as their distinct pick rows.
+
+    Identical brackets (all-chalk entries, mostly) are kept once with a count, so the
+    work grows with the number of distinct brackets rather than entries."""
+
+    picks: np.ndarray
+    """`(unique_count, num_games)` uint8 winner index picked in each game."""
+    counts: np.ndarray
+    """`(unique_count,)` number of entries with each row of `picks`."""
+    entry_rows: np.ndarray
+    """`(entry_count,)` row of `picks` for each original entry."""
+
+    @classmethod
+    def from_pick_matrix(cls, picks: np.ndarray) -> "EntryPool":
+        """Pool from `(entry_count, num_games)` winner indices, -1 for no pick."""
+        picks = np.where(picks < 0, NO_PICK, picks.astype(np.uint8)).astype(np.uint8)
+        unique_picks, entry_rows, counts = np.unique(
+            picks, axis=0, return_inverse=True, return_counts=True
+        )
+        return cls(unique_picks, counts, entry_rows.reshape(-1))
+
+    @classmethod
+    def from_entries(cls, entries: list[BracketEntry]) -> "EntryPool":
+        return cls.from_pick_matrix(pick_matrix(entries))
+
+    @property
+    def entry_count(self) -> int:
+        return len(self.entry_rows)
+
+
+class PoolResults(NamedTuple):
+    """Pool standings over `sim_count` simulations. Per-entry arrays are indexed by
+    row of `EntryPool.picks`; use `EntryPool.entry_rows` to get back to entries."""
+
+    sim_count: int
+    average_scores: np.ndarray
+    win_prob: np.ndarray
+    """Chance one entry with these picks wins the pool. Tied entries split the win,
+    including entries with identical picks."""
+    top_k_prob: np.ndarray
+    """Chance of finishing with fewer than `top_k` entries strictly ahead."""
+    percentile_counts: np.ndarray
+    """`(unique_count, percentile_bins)` simulations finishing in each percentile
+    bin, by share of the pool strictly ahead. Bin 0 is the top of the pool."""
+    leaderboard_rows: np.ndarray
+    """`(sim_count, top_k)` best distinct brackets of each simulation, best first."""
+    leaderboard_scores: np.ndarray
+    """`(sim_count, top_k)` scores of `leaderboard_rows`."""
+
+    def percentile_distribution(self, row: int) -> np.ndarray:
+        return self.percentile_counts[row] / self.sim_count
+
+    def __add__(self, other: "PoolResults") -> "PoolResults":
+        sim_count = self.sim_count + other.sim_count
+        return PoolResults(
+            sim_count=sim_count,
+            average_scores=(
+                self.average_scores * self.sim_count
+                + other.average_scores * other.sim_count
+            )
+            / max(sim_count, 1),
+            win_prob=(self.win_prob * self.sim_count + other.win_prob * other.sim_count)
+            / max(sim_count, 1),
+            top_k_prob=(
+                self.top_k_prob * self.sim_count + other.top_k_prob * other.sim_count
+            )
+            / max(sim_count, 1),
+            percentile_counts=self.percentile_counts + other.percentile_counts,
+            leaderboard_rows=np.concatenate(
+                [self.leaderboard_rows, other.leaderboard_rows]
+            ),
+            leaderboard_scores=np.concatenate(
+                [self.leaderboard_scores, other.leaderboard_scores]
+            ),
+        )
+
+
+class PickIndicators(NamedTuple):
+    """Every `(game_id, team_index)` pair picked by any entry, and who picked it.
+
+    Each team can only win the games on its path, so there are about
+    `num_teams * log2(num_teams)` pairs (384 for 64 teams), however many entries."""
+
+    game_ids: np.ndarray
+    team_indexes: np.ndarray
+    picked: np.ndarray
+    """`(unique_count, pair_count)` whether each entry picked each pair."""
+
+
+def pick_indicators(picks: np.ndarray) -> PickIndicators:
+    game_ids, team_indexes = np.nonzero(
+        np.stack(
+            [
+                np.bincount(game_picks, minlength=NO_PICK + 1)[:NO_PICK] > 0
+                for game_picks in picks.T
+            ]
+        )
+    )
+    return PickIndicators(
+        game_ids, team_indexes, picks[:, game_ids] == team_indexes.astype(np.uint8)
+    )
+
+
+def score_pool_block(
+    outcomes: np.ndarray,
+    points: np.ndarray,
+    indicators: PickIndicators,
+    entry_block_size: int = ENTRY_BLOCK_SIZE,
+) -> np.ndarray:
+    """`(sim_count, unique_count)` scores of the entries in `indicators`.
+
+    Scoring is one matrix product per block of entries: simulations x picked
+    `(game, team)` pairs, holding the points each simulation awards for that pick,
+    times pairs x entries, holding whether each entry made it."""
+    game_ids, team_indexes, picked = indicators
+    if points.ndim == 1:
+        points = np.broadcast_to(points, outcomes.shape)
+    # Integer points add up exactly in float32, which halves the matrix product.
+    dtype = np.float32 if np.array_equal(points, np.round(points)) else np.float64
+    awarded = np.where(
+        outcomes[:, game_ids] == team_indexes, points[:, game_ids], 0
+    ).astype(dtype)
+
+    scores = np.empty((outcomes.shape[0], len(picked)), dtype=dtype)
+    for start in range(0, len(picked), entry_block_size):
+        block = picked[start : start + entry_block_size]
+        scores[:, start : start + len(block)] = awarded @ block.T.astype(dtype)
+    return scores
+
+
+def _code_count_bound(
+    bracket: Bracket, scoring: ScoringSystem, unique_count: int
+) -> int:
+    """Most distinct codes `_score_codes` can give one simulation's scores."""
+    weights = scoring.weights(bracket)
+    max_score = (
+        weights.game_points
+        + weights.seed_points.max(axis=1)
+        + weights.upset_points * (MAX_SEED - 1)
+    ).sum()
+    code_count = int(np.ceil(max_score)) + 1
+    if all(np.array_equal(weight, np.round(weight)) for weight in weights):
+        return code_count
+    # Fractional points are ranked instead, unless they happen to add up to whole
+    # numbers.
+    return max(code_count, unique_count)
+
+
+def _score_codes(scores: np.ndarray) -> np.ndarray:
+    """Each score replaced by a nonnegative integer with the same order in its row.
+
+    Whole-number scores are their own codes; others get their dense rank within the
+    simulation, so there are never more codes per row than entries."""
+    if scores.dtype == np.float32:
+        return np.rint(scores).astype(np.int64)
+    order = np.argsort(scores, axis=1)
+    sorted_scores = np.take_along_axis(scores, order, axis=1)
+    ranks = np.zeros(scores.shape, dtype=np.int64)
+    np.cumsum(np.diff(sorted_scores, axis=1) != 0, axis=1, out=ranks[:, 1:])
+    codes = np.empty_like(ranks)
+    np.put_along_axis(codes, order, ranks, axis=1)
+    return codes
+
+
+def _pool_shard(
+    pool: EntryPool,
+    bracket: Bracket,
+    sim_count: int,
+    seed: int | None,
+    model: WinProbabilityModel,
+    scoring: ScoringSystem,
+    top_k: int,
+    percentile_bins: int,
+    max_block_bytes: int,
+) -> PoolResults:
+    rng = np.random.default_rng(seed)
+    probabilities = model.matrix(bracket)
+    unique_count = len(pool.picks)
+    entry_count = pool.entry_count
+    top_k = min(top_k, unique_count)
+    # About 48 bytes of working arrays per (simulation, unique entry) pair, plus the
+    # two float64 (simulation, score code) count arrays.
+    code_count_bound = _code_count_bound(bracket, scoring, unique_count)
+    sim_block_size = max(
+        1, max_block_bytes // (48 * unique_count + 16 * code_count_bound)
+    )
+    indicators = pick_indicators(pool.picks)
+
+    total_scores = np.zeros(unique_count)
+    wins = np.zeros(unique_count)
+    top_k_counts = np.zeros(unique_count)
+    percentile_counts = np.zeros((unique_count, percentile_bins), dtype=np.int32)
+    leaderboard_rows = []
+    leaderboard_scores = []
+    for start in range(0, sim_count, sim_block_size):
+        block_sim_count = min(sim_block_size, sim_count - start)
+        outcomes = simulate_outcomes(bracket, probabilities, block_sim_count, rng=rng)
+        scores = score_pool_block(
+            outcomes, scoring.points(bracket, outcomes), indicators
+        )
+        total_scores += scores.sum(axis=0)
+
+        # Weighted count of entries at each score in each simulation, with scores
+        # replaced by their order so the counts can be one bincount.
+        codes = _score_codes(scores)
+        code_count = int(codes.max()) + 1
+        at_score = np.bincount(
+            (np.arange(block_sim_count)[:, None] * code_count + codes).ravel(),
+            weights=np.broadcast_to(pool.counts, codes.shape).ravel(),
+            minlength=block_sim_count * code_count,
+        ).reshape(block_sim_count, code_count)
+        at_or_below = np.cumsum(at_score, axis=1)
+        ahead = entry_count - np.take_along_axis(at_or_below, codes, axis=1)
+        tied = np.take_along_axis(at_score, codes, axis=1)
+
+        is_winner = (ahead == 0) & (scores > 0)
+        wins += (is_winner / tied).sum(axis=0)
+        top_k_counts += (ahead < top_k).sum(axis=0)
+        bins = np.minimum(
+            (ahead * percentile_bins / entry_count).astype(np.int64),
+            percentile_bins - 1,
+        )
+        percentile_counts += np.bincount(
+            (np.arange(unique_count) * percentile_bins + bins).ravel(),
+            minlength=unique_count * percentile_bins,
+        ).reshape(unique_count, percentile_bins)
+
+        best = np.argpartition(-scores, top_k - 1, axis=1)[:, :top_k]
+        best_scores = np.take_along_axis(scores, best, axis=1)
+        order = np.argsort(-best_scores, axis=1, kind="stable")
+        leaderboard_rows.append(np.take_along_axis(best, order, axis=1))
+        leaderboard_scores.append(np.take_along_axis(best_scores, order, axis=1))
+
+    divisor = max(sim_count, 1)
+    return PoolResults(
+        sim_count=sim_count,
+        average_scores=total_scores / divisor,
+        win_prob=wins / divisor,
+        top_k_prob=top_k_counts / divisor,
+        percentile_counts=percentile_counts,
+        leaderboard_rows=np.concatenate(leaderboard_rows or [np.empty((0, top_k))]),
+        leaderboard_scores=np.concatenate(leaderboard_scores or [np.empty((0, top_k))]),
+    )
+
+
+def simulate_pool(
+    pool: EntryPool,
+    bracket: Bracket,
+    sim_count: int = 1_000,
+    *,
+    model: WinProbabilityModel = EloStyle(),
+    scoring: ScoringSystem = ESPN,
+    seed: int = 40351,
+    top_k: int = 10,
+    percentile_bins: int = PERCENTILE_BINS,
+    max_block_bytes: int = MAX_BLOCK_BYTES,
+    workers: int | None = None,
+) -> PoolResults:
+    """Simulate a pool of up to hundreds of thousands of entries.
+
+    Simulations are split into one shard per worker process, seeded like
+    `ParallelSimulation`. Each shard simulates and scores a block of simulations at a
+    time, sized so a block's scores stay near `max_block_bytes`."""
+    workers = workers or os.cpu_count() or 1
+    shard_args = (
+        [pool] * workers,
+        [bracket] * workers,
+        shard_sim_counts(sim_count, workers),
+        shard_seeds(seed, workers),
+        [model] * workers,
+        [scoring] * workers,
+        [top_k] * workers,
+        [percentile_bins] * workers,
+        [max_block_bytes] * workers,
+    )
+    if workers == 1:
+        shard_results = list(map(_pool_shard, *shard_args))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            shard_results = list(executor.map(_pool_shard, *shard_args))
+
+    results = shard_results[0]
+    for shard_result in shard_results[1:]:
+        results += shard_result
+    return results
+
+
+if __name__ == "__main__":
+    import time
+
+    from march_madness import INITIAL_BRACKET_PATH
+    from march_madness.group import Group
+    from march_madness.kenpom import update_bracket_kenpoms
+    from march_madness.win_probability import BestSeedWins
+
+    bracket = Bracket.model_validate_json(INITIAL_BRACKET_PATH.read_text())
+    update_bracket_kenpoms(bracket)
+
+    # A stand-in for the public challenge: model-like picks plus some chalk.
+    rng = np.random.default_rng(1)
+    public_count = 200_000
+    public_picks = np.concatenate(
+        [
+            simulate_outcomes(
+                bracket,
+                EloStyle().matrix(bracket),
+                public_count * 9 // 10,
+                rng=rng,
+            ),
+            simulate_outcomes(
+                bracket, BestSeedWins().matrix(bracket), public_count // 10, rng=rng
+            ),
+        ]
+    )
+    group = Group.load()
+    pool = EntryPool.from_pick_matrix(
+        np.concatenate([pick_matrix(group.entries), public_picks])
+    )
+    print(f"{pool.entry_count:,} entries, {len(pool.picks):,} distinct brackets")
+
+    start = time.monotonic()
+    results = simulate_pool(pool, bracket, sim_count=1_000)
+    print(f"Simulated in {time.monotonic() - start:.1f}s")
+
+    for index, entry in enumerate(group.entries):
+        row = pool.entry_rows[index]
+        percentiles = results.percentile_distribution(row)
+        median_bin = np.searchsorted(np.cumsum(percentiles), 0.5)
+        print(
+            f"{entry.user}: win {results.win_prob[row] * 100:.3f}%, "
+            f"top 10 {results.top_k_prob[row] * 100:.2f}%, "
+            f"median finish top {(median_bin + 1) * 100 // len(percentiles)}%"
+        )
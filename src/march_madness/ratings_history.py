@@ -0,0 +1,219 @@
+import bisect
+import functools
+import hashlib
+import json
+import zlib
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import NamedTuple
+
+snapshot_folder = Path("data/kenpom/snapshots")
+
+KEYFRAME_INTERVAL = 32
+"""Every this many snapshots is stored in full, so loading one replays at most this
+many diffs."""
+
+
+def ratings_hash(ratings: dict[str, float]) -> str:
+    """Hash of team name -> rating, independent of order."""
+    return hashlib.sha256(json.dumps(ratings, sort_keys=True).encode()).hexdigest()
+
+
+class Snapshot(NamedTuple):
+    """One entry of the index: where a version of the ratings is in the log."""
+
+    position: int
+    fetched_at: datetime
+    content_hash: str
+    offset: int
+    length: int
+    keyframe: int
+    """Position of the full snapshot the diffs up to this one start from."""
+
+
+class RatingsHistory:
+    """Append-only history of KenPom ratings (team name -> AdjEM).
+
+    `ratings.log` holds zlib-compressed JSON records: a full snapshot every
+    `KEYFRAME_INTERVAL` versions, and otherwise the teams that changed since the
+    previous version. `index.jsonl` has one line per version with its fetch time,
+    content hash and place in the log, and is all that's read to find a version.
+    Saving ratings that equal the latest version adds nothing."""
+
+    def __init__(self, folder: Path = snapshot_folder):
+        self.folder = Path(folder)
+        self.log_path = self.folder / "ratings.log"
+        self.index_path = self.folder / "index.jsonl"
+        self._snapshots: list[Snapshot] = []
+        self._times: list[float] = []
+        self._by_hash: dict[str, Snapshot] = {}
+        self._index_bytes_read = 0
+        self._ratings_cache: dict[int, dict[str, float]] = {}
+
+    def snapshots(self) -> list[Snapshot]:
+        self._read_new_index_lines()
+        return list(self._snapshots)
+
+    def latest(self) -> Snapshot | None:
+        self._read_new_index_lines()
+        return self._snapshots[-1] if self._snapshots else None
+
+    def at(self, as_of: datetime) -> Snapshot:
+        """The last version fetched at or before `as_of`. Naive times are local."""
+        self._read_new_index_lines()
+        position = bisect.bisect_right(self._times, _utc(as_of).timestamp()) - 1
+        if position < 0:
+            raise LookupError(f"No ratings saved at or before {as_of}")
+        return self._snapshots[position]
+
+    def by_hash(self, content_hash: str) -> Snapshot:
+        """The first version with these ratings (see `ratings_hash`)."""
+        self._read_new_index_lines()
+        try:
+            return self._by_hash[content_hash]
+        except KeyError:
+            raise LookupError(f"No ratings with hash {content_hash}") from None
+
+    def ratings(self, snapshot: Snapshot) -> dict[str, float]:
+        """The ratings saved in `snapshot`. Shared between callers, so don't modify
+        them."""
+        ratings = self._ratings_cache.get(snapshot.position)
+        if ratings is None:
+            ratings = self._load(snapshot)
+            self._ratings_cache[snapshot.position] = ratings
+        return ratings
+
+    def ratings_as_of(self, as_of: datetime) -> dict[str, float]:
+        return self.ratings(self.at(as_of))
+
+    def add(
+        self,
+        ratings: dict[str, float],
+        fetched_at: datetime | None = None,
+    ) -> Snapshot:
+        """Save `ratings`, fetched at `fetched_at` (default now), unless they equal
+        the latest version, which is then returned instead."""
+        fetched_at = _utc(fetched_at or datetime.now(timezone.utc))
+        content_hash = ratings_hash(ratings)
+        latest = self.latest()
+        if latest is not None and latest.content_hash == content_hash:
+            return latest
+        if latest is not None and fetched_at < latest.fetched_at:
+            raise ValueError(
+                f"Ratings fetched at {fetched_at} are older than the latest version "
+                f"({latest.fetched_at})"
+            )
+
+        position = len(self._snapshots)
+        if position % KEYFRAME_INTERVAL == 0:
+            keyframe = position
+            record = {"ratings": ratings}
+        else:
+            keyframe = latest.keyframe
+            previous = self.ratings(latest)
+            record = {
+                "set": {
+                    team: rating
+                    for team, rating in ratings.items()
+                    if previous.get(team) != rating
+                },
+                "remove": [team for team in previous if team not in ratings],
+            }
+        data = zlib.compress(json.dumps(record).encode())
+
+        self.folder.mkdir(parents=True, exist_ok=True)
+        with open(self.log_path, "ab") as file:
+            offset = file.tell()
+            file.write(data)
+        snapshot = Snapshot(
+            position=position,
+            fetched_at=fetched_at,
+            content_hash=content_hash,
+            offset=offset,
+            length=len(data),
+            keyframe=keyframe,
+        )
+        # The index line goes last, so a crash mid-write leaves no version pointing
+        # at a partial record.
+        with open(self.index_path, "a", encoding="utf-8") as file:
+            file.write(
+                json.dumps(
+                    {
+                        "fetched_at": fetched_at.isoformat(),
+                        "content_hash": content_hash,
+                        "offset": offset,
+                        "length": len(data),
+                        "keyframe": keyframe,
+                    }
+                )
+                + "\n"
+            )
+        self._read_new_index_lines()
+        self._ratings_cache[position] = dict(ratings)
+        return snapshot
+
+    def _read_new_index_lines(self) -> None:
+        """Pick up versions added since the last read, including by other processes."""
+        if not self.index_path.exists():
+            return
+        with open(self.index_path, "rb") as file:
+            file.seek(self._index_bytes_read)
+            new_bytes = file.read()
+        complete = new_bytes[: new_bytes.rfind(b"\n") + 1]
+        self._index_bytes_read += len(complete)
+        for line in complete.decode("utf-8").splitlines():
+            entry = json.loads(line)
+            snapshot = Snapshot(
+                position=len(self._snapshots),
+                fetched_at=datetime.fromisoformat(entry["fetched_at"]),
+                content_hash=entry["content_hash"],
+                offset=entry["offset"],
+                length=entry["length"],
+                keyframe=entry["keyframe"],
+            )
+            self._snapshots.append(snapshot)
+            self._times.append(snapshot.fetched_at.timestamp())
+            self._by_hash.setdefault(snapshot.content_hash, snapshot)
+
+    def _load(self, snapshot: Snapshot) -> dict[str, float]:
+        with open(self.log_path, "rb") as file:
+            ratings = {}
+            for position in range(snapshot.keyframe, snapshot.position + 1):
+                entry = self._snapshots[position]
+                file.seek(entry.offset)
+                record = json.loads(zlib.decompress(file.read(entry.length)))
+                if "ratings" in record:
+                    ratings = record["ratings"]
+                    continue
+                ratings.update(record["set"])
+                for team in record["remove"]:
+                    del ratings[team]
+        if ratings_hash(ratings) != snapshot.content_hash:
+            raise ValueError(
+                f"Snapshot {snapshot.position} of {self.log_path} is corrupt"
+            )
+        return ratings
+
+
+def _utc(moment: datetime) -> datetime:
+    return moment.astimezone(timezone.utc)
+
+
+@functools.cache
+def default_history() -> RatingsHistory:
+    """The history in `snapshot_folder`, shared for the whole process."""
+    return RatingsHistory()
+
+
+if __name__ == "__main__":
+    from march_madness.kenpom import get_kenpom_data, known_good_json_path
+
+    history = default_history()
+    # Start the history from the saved ratings, as of when they were saved.
+    fetched_at = datetime.fromtimestamp(known_good_json_path.stat().st_mtime)
+    snapshot = history.add(get_kenpom_data(), fetched_at=fetched_at)
+    for snapshot in history.snapshots():
+        print(
+            f"{snapshot.position:>4} {snapshot.fetched_at:%Y-%m-%d %H:%M} "
+            f"{snapshot.content_hash[:12]} {snapshot.length:>6,} bytes"
+        )
@@ -0,0 +1,376 @@
+import asyncio
+import threading
+import time
+from datetime import datetime, timezone
+from typing import AsyncIterator, Callable, NamedTuple
+
+from march_madness import Bracket, get_bracket
+from march_madness.group import Group
+from march_madness.incremental import IncrementalSimGroup
+from march_madness.kenpom import default_fetcher, save_ratings, update_bracket_kenpoms
+from march_madness.kenpom_fetch import RatingsFetcher
+from march_madness.scoring import ESPN, ScoringSystem
+from march_madness.win_probability import EloStyle, WinProbabilityModel
+
+
+class RefreshUpdate(NamedTuple):
+    """What a `RefreshDaemon` publishes after each recompute."""
+
+    version: int
+    computed_at: datetime
+    changed_teams: list[str]
+    """Teams whose rating changed since the last update."""
+    new_results: list[int]
+    """Ids of the games decided (or corrected) since the last update."""
+    game_probabilities: dict[int, list[tuple[str, float]]]
+    """Chance of each team winning each undecided game, as in `Simulation.results`."""
+    winner_prob: dict[str | None, float]
+    user_average_scores: dict[str, float]
+    elapsed: float
+    """Seconds the recompute took."""
+
+
+def _results_key(bracket: Bracket) -> tuple:
+    return tuple(game.winner_index for game in bracket.games)
+
+
+def _extends(bracket: Bracket, previous: Bracket) -> bool:
+    """Whether `bracket` has every result of `previous`, and maybe more."""
+    return all(
+        old.winner_index is None or old.winner_index == new.winner_index
+        for new, old in zip(bracket.games, previous.games)
+    )
+
+
+class RefreshDaemon:
+    """Keeps a group's odds up to date while the tournament is on.
+
+    Polls the ratings through `fetcher` every `ratings_interval` seconds, and the
+    results through `poll_results` every `results_interval` (by default `get_bracket`,
+    which only re-reads `current_bracket.json` when it changes). Changes are collected
+    until none has come in for `debounce` seconds, then applied together to one
+    `IncrementalSimGroup`: new results only replace the samples that got them wrong,
+    and new ratings only recompute the win probabilities of the teams that changed
+    before re-simulating. A corrected result starts the simulations over.
+
+    Every recompute is published to each `subscribe()` iterator and kept in `latest`.
+    A poll that fails is retried after a delay that doubles up to `max_backoff`."""
+
+    def __init__(
+        self,
+        group: Group,
+        *,
+        fetcher: RatingsFetcher | None = None,
+        poll_results: Callable[[], Bracket] = get_bracket,
+        save: bool = False,
+        sim_count: int = 100_000,
+        seed: int | None = None,
+        model: WinProbabilityModel = EloStyle(),
+        scoring: ScoringSystem = ESPN,
+        ratings_interval: float = 600.0,
+        results_interval: float = 60.0,
+        debounce: float = 5.0,
+        max_backoff: float = 1800.0,
+        suppress_print: bool = False,
+    ) -> None:
+        self.group = group
+        self.fetcher = fetcher or default_fetcher()
+        self.poll_results = poll_results
+        self.save = save
+        """Whether fetched ratings overwrite the known good ones (see `save_ratings`).
+        Off by default, so only a caller that asks for it rewrites the data files."""
+        self.sim_count = sim_count
+        self.seed = seed
+        self.model = model
+        self.scoring = scoring
+        self.ratings_interval = ratings_interval
+        self.results_interval = results_interval
+        self.debounce = debounce
+        self.max_backoff = max_backoff
+        self._suppress_print = suppress_print
+
+        self.sim_group: IncrementalSimGroup | None = None
+        self.latest: RefreshUpdate | None = None
+        # The ratings and results `sim_group` was last updated with.
+        self._ratings: dict[str, float] | None = None
+        self._results_key: tuple | None = None
+        self._pending_ratings: dict[str, float] | None = None
+        self._pending_bracket: Bracket | None = None
+        self._changed: asyncio.Event | None = None
+        self._subscribers: set[asyncio.Queue] = set()
+
+    async def run(self) -> None:
+        """Compute the starting odds, then poll and recompute until cancelled."""
+        self._changed = asyncio.Event()
+        try:
+            await self._poll(self._fetch_ratings, self._queue_ratings)
+        except Exception as error:
+            self._print(f"Using the saved ratings: fetching new ones failed ({error})")
+        try:
+            await self._poll(self._fetch_results, self._queue_results)
+        except Exception as error:
+            self._print(f"Using the saved bracket: polling results failed ({error})")
+            self._queue_results(get_bracket())
+        self._changed.clear()
+        await self._recompute()
+        async with asyncio.TaskGroup() as task_group:
+            task_group.create_task(
+                self._poll_loop(
+                    self._fetch_ratings, self._queue_ratings, self.ratings_interval
+                )
+            )
+            task_group.create_task(
+                self._poll_loop(
+                    self._fetch_results, self._queue_results, self.results_interval
+                )
+            )
+            task_group.create_task(self._recompute_loop())
+
+    def run_in_thread(self) -> threading.Thread:
+        """Run on a background thread with its own event loop, e.g. next to a Dash
+        server. Read `latest` to get the odds."""
+        thread = threading.Thread(target=asyncio.run, args=(self.run(),), daemon=True)
+        thread.start()
+        return thread
+
+    async def subscribe(self) -> AsyncIterator[RefreshUpdate]:
+        """Yield `latest`, if any, then each update as it's published. A subscriber
+        that falls behind skips to the newest update."""
+        queue = asyncio.Queue(maxsize=1)
+        self._subscribers.add(queue)
+        try:
+            if self.latest is not None:
+                yield self.latest
+            while True:
+                yield await queue.get()
+        finally:
+            self._subscribers.discard(queue)
+
+    def _fetch_ratings(self) -> dict[str, float] | None:
+        result = self.fetcher.fetch()
+        if not result.changed:
+            return None
+        if self.save:
+            return save_ratings(result.table, result.html)
+        return result.table.ratings()
+
+    def _fetch_results(self) -> Bracket | None:
+        bracket = self.poll_results()
+        if self._pending_bracket is not None:
+            known_key = _results_key(self._pending_bracket)
+        else:
+            known_key = self._results_key
+        if _results_key(bracket) == known_key:
+            return None
+        return bracket
+
+    def _queue_ratings(self, ratings: dict[str, float]) -> bool:
+        if self._pending_ratings is not None:
+            known = self._pending_ratings
+        else:
+            known = self._ratings
+        if ratings == known:
+            return False
+        self._pending_ratings = ratings
+        return True
+
+    def _queue_results(self, bracket: Bracket) -> bool:
+        self._pending_bracket = bracket
+        return True
+
+    async def _poll(self, fetch: Callable, queue: Callable[..., bool]) -> None:
+        """Run `fetch` off the event loop, and `queue` whatever it found changed."""
+        changed = await asyncio.to_thread(fetch)
+        if changed is not None and queue(changed):
+            self._changed.set()
+
+    async def _poll_loop(
+        self, fetch: Callable, queue: Callable[..., bool], interval: float
+    ) -> None:
+        delay = interval
+        failures = 0
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                await self._poll(fetch, queue)
+            except Exception as error:
+                failures += 1
+                delay = max(interval, min(interval * 2**failures, self.max_backoff))
+                self._print(f"{fetch.__name__} failed ({error}); retry in {delay:g}s")
+                continue
+            failures = 0
+            delay = interval
+
+    async def _recompute_loop(self) -> None:
+        failures = 0
+        while True:
+            await self._changed.wait()
+            # Let a burst of changes settle, so they cost one recompute.
+            while True:
+                self._changed.clear()
+                try:
+                    await asyncio.wait_for(self._changed.wait(), self.debounce)
+                except TimeoutError:
+                    break
+            try:
+                await self._recompute()
+            except Exception as error:
+                # The changes are still pending; try them again after a delay.
+                failures += 1
+                delay = min(self.debounce * 2**failures, self.max_backoff)
+                self._print(f"Recompute failed ({error}); retry in {delay:g}s")
+                await asyncio.sleep(delay)
+                self._changed.set()
+                continue
+            failures = 0
+
+    async def _recompute(self) -> None:
+        """Apply the pending changes. If that fails, they stay pending, unless newer
+        ones came in meanwhile."""
+        ratings, bracket = self._pending_ratings, self._pending_bracket
+        self._pending_ratings = self._pending_bracket = None
+        try:
+            update = await asyncio.to_thread(self._apply, ratings, bracket)
+        except Exception:
+            if self._pending_ratings is None:
+                self._pending_ratings = ratings
+            if self._pending_bracket is None:
+                self._pending_bracket = bracket
+            raise
+        if update is None:
+            return
+        self.latest = update
+        for queue in self._subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(update)
+        self._print(
+            f"Update {update.version}: {len(update.changed_teams)} ratings and "
+            f"{len(update.new_results)} results changed, "
+            f"recomputed in {update.elapsed:.2f}s"
+        )
+
+    def _apply(
+        self, ratings: dict[str, float] | None, bracket: Bracket | None
+    ) -> RefreshUpdate | None:
+        start = time.perf_counter()
+        changed_teams: list[int] = []
+        new_results: list[int] = []
+        rebuilt = False
+
+        if self.sim_group is None or (
+            bracket is not None
+            and not _extends(bracket, self.sim_group.current_bracket)
+        ):
+            if self.sim_group is not None:
+                new_results = [
+                    new.game_id
+                    for new, old in zip(
+                        bracket.games, self.sim_group.current_bracket.games
+                    )
+                    if new.winner_index != old.winner_index
+                ]
+            bracket = bracket.clone()
+            kenpom_data = ratings if ratings is not None else self._ratings
+            if kenpom_data is not None:
+                update_bracket_kenpoms(bracket, kenpom_data)
+            self.sim_group = IncrementalSimGroup(
+                group=self.group,
+                current_bracket=bracket,
+                sim_count=self.sim_count,
+                suppress_print=True,
+                seed=self.seed,
+                model=self.model,
+                scoring=self.scoring,
+            )
+            rebuilt = True
+        else:
+            current = self.sim_group.current_bracket
+            if bracket is not None:
+                for game, current_game in zip(bracket.games, current.games):
+                    if (
+                        current_game.winner_index is None
+                        and game.winner_index is not None
+                    ):
+                        self.sim_group.advance_winner(current_game, game.winner_index)
+                        new_results.append(game.game_id)
+            if ratings is not None:
+                changed_teams = self.sim_group.update_ratings(ratings)
+
+        # Only now that `sim_group` has them are the changes no longer pending.
+        if ratings is not None:
+            self._ratings = ratings
+        if bracket is not None:
+            self._results_key = _results_key(bracket)
+        if not rebuilt and not new_results and not changed_teams:
+            return None
+
+        sim_group = self.sim_group
+        bracket = sim_group.current_bracket
+        return RefreshUpdate(
+            version=self.latest.version + 1 if self.latest else 1,
+            computed_at=datetime.now(timezone.utc),
+            changed_teams=[bracket.teams[index].name for index in changed_teams],
+            new_results=new_results,
+            game_probabilities={
+                game.game_id: sim_group.results(game.game_id)
+                for game in bracket.games
+                if game.winner_index is None
+            },
+            winner_prob=dict(sim_group.winner_prob),
+            user_average_scores=dict(sim_group.user_average_scores),
+            elapsed=time.perf_counter() - start,
+        )
+
+    def _print(self, message: str) -> None:
+        if not self._suppress_print:
+            print(message)
+
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+
+    from rich.pretty import pprint
+
+    from march_madness.kenpom import known_good_html_path
+    from march_madness.kenpom_fetch import HttpSource, StubRatingsServer
+
+    # Replay the Sweet 16 against a local copy of the ratings page.
+    actual_bracket = get_bracket()
+    results = actual_bracket.clone()
+    for game in results.games[48:]:
+        game.winner_index = None
+        if game.round_of < 16:
+            game.team1_index = game.team2_index = None
+
+    async def main(page: Path) -> None:
+        with StubRatingsServer(page) as server:
+            daemon = RefreshDaemon(
+                Group.load(),
+                fetcher=RatingsFetcher(HttpSource(server.url)),
+                poll_results=lambda: results.clone(),
+                sim_count=20_000,
+                seed=40351,
+                ratings_interval=0.5,
+                results_interval=0.5,
+                debounce=0.5,
+            )
+            task = asyncio.create_task(daemon.run())
+            updates = daemon.subscribe()
+            pprint((await anext(updates)).winner_prob, indent_guides=False)
+
+            # A ratings change and two results in quick succession: one recompute.
+            page.write_text(page.read_text().replace("+39.64", "+45.00"))
+            for game in actual_bracket.games[48:50]:
+                results.advance_winner(game, game.winner_index)
+            update = await anext(updates)
+            print(f"Changed teams: {update.changed_teams}")
+            print(f"New results: {update.new_results}")
+            pprint(update.winner_prob, indent_guides=False)
+            task.cancel()
+
+    with tempfile.TemporaryDirectory() as folder:
+        page = Path(folder) / "kenpom.html"
+        page.write_text(known_good_html_path.read_text(encoding="utf-8"))
+        asyncio.run(main(page))
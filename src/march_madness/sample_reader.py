@@ -0,0 +1,233 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+
+from march_madness import Bracket
+from march_madness.group import Group, SimGroup
+from march_madness.sample_store import SampleStore
+from march_madness.scoring import ESPN, ScoringSystem
+from march_madness.vectorized import pick_matrix, win_shares
+
+DEFAULT_CHUNK_SIZE = 500_000
+"""Samples unpacked at a time per worker, about 32 MB of winner indices."""
+
+
+def reaches(bracket: Bracket, team_index: int, round_of: int) -> tuple[int, int]:
+    """Condition for `given`: `team_index` wins its game in the round of `2 * round_of`.
+
+    `reaches(bracket, team_index, 4)` is "reaches the Final Four"."""
+    topology = bracket.topology()
+    game_id = next(
+        game_id
+        for game_id, team_indexes in enumerate(topology.initial_team_indexes)
+        if team_index in team_indexes
+    )
+    while topology.round_of[game_id] > 2 * round_of:
+        game_id = topology.next_game_id[game_id]
+    if topology.round_of[game_id] != 2 * round_of:
+        raise ValueError(f"No round of {round_of} in this bracket")
+    return game_id, team_index
+
+
+class SampleTotals(NamedTuple):
+    """Sums over the stored samples that meet every `given` condition."""
+
+    sample_count: int
+    game_counts: np.ndarray
+    """`(num_games, num_teams)` number of samples each team won each game."""
+    total_scores: np.ndarray | None
+    """`(num_entries,)` summed score of each entry, if entries were given."""
+    win_counts: np.ndarray | None
+    """`(num_entries + 1,)` samples each entry won, with ties split evenly. The last
+    is nobody scoring."""
+
+    def __add__(self, other: "SampleTotals") -> "SampleTotals":
+        return SampleTotals(
+            sample_count=self.sample_count + other.sample_count,
+            game_counts=self.game_counts + other.game_counts,
+            total_scores=(
+                None
+                if self.total_scores is None
+                else self.total_scores + other.total_scores
+            ),
+            win_counts=(
+                None if self.win_counts is None else self.win_counts + other.win_counts
+            ),
+        )
+
+
+def _chunk_totals(
+    path: Path,
+    start: int,
+    stop: int,
+    given: tuple[tuple[int, int], ...],
+    picks: np.ndarray | None,
+    scoring: ScoringSystem,
+) -> SampleTotals:
+    store = SampleStore(path)
+    num_teams = len(store.bracket.teams)
+    outcomes = store.outcomes(start, stop)
+    for game_id, team_index in given:
+        outcomes = outcomes[outcomes[:, game_id] == team_index]
+
+    game_counts = np.zeros((outcomes.shape[1], num_teams), dtype=np.int64)
+    for game_id in range(outcomes.shape[1]):
+        game_counts[game_id] = np.bincount(outcomes[:, game_id], minlength=num_teams)
+
+    total_scores = win_counts = None
+    if picks is not None:
+        scores = scoring.score_matrix(store.bracket, outcomes, picks)
+        total_scores = scores.sum(axis=0)
+        shares = win_shares(scores)
+        win_counts = np.append(
+            shares.sum(axis=0), np.count_nonzero(~shares.any(axis=1))
+        )
+    return SampleTotals(len(outcomes), game_counts, total_scores, win_counts)
+
+
+class SampleReader:
+    """Reductions over a `SampleStore`, one chunk at a time.
+
+    Chunks are memory mapped and unpacked by `workers` processes, so memory use
+    depends on `chunk_size` and `workers`, not on how many samples the file holds."""
+
+    def __init__(
+        self,
+        path: Path,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        workers: int | None = None,
+    ):
+        self.path = Path(path)
+        self.store = SampleStore(self.path)
+        self.chunk_size = chunk_size
+        self.workers = workers or os.cpu_count() or 1
+
+    def totals(
+        self,
+        entries_picks: np.ndarray | None = None,
+        given: tuple[tuple[int, int], ...] = (),
+        scoring: ScoringSystem = ESPN,
+    ) -> SampleTotals:
+        """Sum per-game wins, and entry scores and wins if `entries_picks` (see
+        `pick_matrix`) is given, over the samples where every `(game_id, team_index)`
+        in `given` happened."""
+        sample_count = len(self.store)
+        starts = list(range(0, sample_count, self.chunk_size))
+        stops = [min(start + self.chunk_size, sample_count) for start in starts]
+        args = (
+            [self.path] * len(starts),
+            starts,
+            stops,
+            [tuple(given)] * len(starts),
+            [entries_picks] * len(starts),
+            [scoring] * len(starts),
+        )
+
+        totals = _chunk_totals(self.path, 0, 0, tuple(given), entries_picks, scoring)
+        if self.workers == 1:
+            for chunk_totals in map(_chunk_totals, *args):
+                totals += chunk_totals
+        else:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                for chunk_totals in executor.map(_chunk_totals, *args):
+                    totals += chunk_totals
+        return totals
+
+    def game_probabilities(
+        self,
+        given: tuple[tuple[int, int], ...] = (),
+    ) -> dict[int, dict[str, float]]:
+        """Chance of each team winning each game, given the conditions in `given`."""
+        totals = self.totals(given=given)
+        teams = self.store.bracket.teams
+        return {
+            game_id: {
+                teams[team_index].name: float(counts[team_index] / totals.sample_count)
+                for team_index in np.argsort(-counts, kind="stable")
+                if counts[team_index]
+            }
+            for game_id, counts in enumerate(totals.game_counts)
+        }
+
+
+class StoredSimGroup(SimGroup):
+    """A `SimGroup` whose simulations come from a `SampleStore` file.
+
+    Entries can be scored against samples simulated long ago, and `given` limits the
+    results to samples where each `(game_id, team_index)` happened (see `reaches`).
+    `sim_count` is the number of samples that matched; if none did, a `ValueError` is
+    raised."""
+
+    def __init__(
+        self,
+        group: Group,
+        path: Path,
+        given: tuple[tuple[int, int], ...] = (),
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        workers: int | None = None,
+        suppress_print: bool = False,
+        scoring: ScoringSystem = ESPN,
+    ) -> None:
+        self.reader = SampleReader(path, chunk_size=chunk_size, workers=workers)
+        self.given = given
+        super().__init__(
+            group=group,
+            current_bracket=self.reader.store.bracket,
+            sim_count=len(self.reader.store),
+            suppress_print=suppress_print,
+            scoring=scoring,
+        )
+
+    def _do_sim(self):
+        if not self._suppress_print:
+            print(
+                f"Scoring {self.sim_count:,} stored brackets "
+                f"on {self.reader.workers} workers"
+            )
+        totals = self.reader.totals(
+            pick_matrix(self.group.entries), self.given, self.scoring
+        )
+        if not totals.sample_count:
+            raise ValueError(
+                f"No samples in {self.reader.path} match the conditions {self.given}"
+            )
+        self.sim_count = totals.sample_count
+        for index, entry in enumerate(self.group.entries):
+            self._user_total_scores[entry.user] = float(totals.total_scores[index])
+            if totals.win_counts[index]:
+                self._winner_counter[entry.user] = float(totals.win_counts[index])
+        if totals.win_counts[-1]:
+            self._winner_counter[None] = int(totals.win_counts[-1])
+        self._summarize()
+
+
+if __name__ == "__main__":
+    import time
+
+    from rich.pretty import pprint
+
+    from march_madness.sample_store import sample_folder
+
+    path = max(sample_folder.glob("*.samples"), key=lambda path: path.stat().st_mtime)
+    group = Group.load()
+
+    start = time.monotonic()
+    sim_group = StoredSimGroup(group, path)
+    print(f"Done in {time.monotonic() - start:.1f}s")
+    pprint(sim_group.winner_prob, indent_guides=False)
+
+    # Who wins the group if the best-rated team reaches the Final Four?
+    bracket = sim_group.current_bracket
+    favorite_index = max(
+        range(len(bracket.teams)), key=lambda index: bracket.teams[index].kenpom
+    )
+    given = (reaches(bracket, favorite_index, 4),)
+    conditional = StoredSimGroup(group, path, given=given, suppress_print=True)
+    print(
+        f"\nGiven {bracket.teams[favorite_index].name} reaches the Final Four "
+        f"({conditional.sim_count:,} samples):"
+    )
+    pprint(conditional.winner_prob, indent_guides=False)
@@ -0,0 +1,222 @@
+import hashlib
+import json
+from pathlib import Path
+
+import numpy as np
+import pydantic
+
+from march_madness import Bracket
+from march_madness import win_probability
+from march_madness.vectorized import contestants, simulate_outcomes
+from march_madness.win_probability import EloStyle, WinProbabilityModel
+
+SAMPLE_STORE_VERSION = 1
+MAGIC = b"MMSAMPLE"
+HEADER_ALIGNMENT = 64
+"""The header is padded so the packed rows start on a 64-byte boundary."""
+
+sample_folder = Path("data/samples")
+
+
+def bracket_hash(bracket: Bracket) -> str:
+    """Hash of the bracket's teams, ratings and results."""
+    payload = json.dumps(bracket.model_dump(mode="json"), sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def pack_outcomes(bracket: Bracket, outcomes: np.ndarray) -> np.ndarray:
+    """Pack `(sim_count, num_games)` winner indices into one bit per game.
+
+    Bit `game_id` of a row is set when `team1` of that game won. The teams in each
+    game follow from the earlier bits, so a 63-game tournament fits in 8 bytes."""
+    team1 = contestants(bracket, outcomes, list(range(len(bracket.games))), side=0)
+    return np.packbits(outcomes == team1, axis=1, bitorder="little")
+
+
+def unpack_outcomes(bracket: Bracket, packed: np.ndarray) -> np.ndarray:
+    """Inverse of `pack_outcomes`."""
+    num_games = len(bracket.games)
+    team1_wins = np.unpackbits(
+        np.asarray(packed), axis=1, count=num_games, bitorder="little"
+    ).astype(bool)
+    outcomes = np.full((len(packed), num_games), -1, dtype=np.int8)
+    for game_ids in bracket.topology().rounds:
+        team1 = contestants(bracket, outcomes, game_ids, side=0)
+        team2 = contestants(bracket, outcomes, game_ids, side=1)
+        outcomes[:, game_ids] = np.where(team1_wins[:, game_ids], team1, team2)
+    return outcomes
+
+
+class SampleStoreHeader(pydantic.BaseModel):
+    version: int = SAMPLE_STORE_VERSION
+    bracket_hash: str
+    model_name: str
+    model_params: dict
+    num_games: int
+    row_bytes: int
+    """Bytes per stored tournament."""
+    bracket: Bracket
+    """The bracket the samples were simulated from, needed to unpack them."""
+
+    def model(self) -> WinProbabilityModel:
+        return getattr(win_probability, self.model_name)(**self.model_params)
+
+
+class SampleStore:
+    """Append-only file of simulated tournaments, one packed row each.
+
+    The file is `MAGIC`, the header length as a little-endian uint32, the JSON
+    `SampleStoreHeader` padded to `HEADER_ALIGNMENT`, then the rows. Rows can be
+    appended at any time and read back through a memory map, so 10M tournaments take
+    80 MB on disk and none of it has to be loaded at once. A partly written last row
+    (from an interrupted append) is ignored."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, "rb") as file:
+            if file.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{self.path} is not a sample store")
+            header_length = int.from_bytes(file.read(4), "little")
+            self.header = SampleStoreHeader.model_validate_json(
+                file.read(header_length)
+            )
+        if self.header.version != SAMPLE_STORE_VERSION:
+            raise ValueError(
+                f"{self.path} is version {self.header.version}, "
+                f"expected {SAMPLE_STORE_VERSION}"
+            )
+        self.data_offset = _padded(len(MAGIC) + 4 + header_length)
+
+    @classmethod
+    def create(
+        cls,
+        path: Path,
+        bracket: Bracket,
+        model: WinProbabilityModel = EloStyle(),
+    ) -> "SampleStore":
+        """Start an empty store for samples of `bracket` under `model`."""
+        path = Path(path)
+        if path.exists():
+            raise FileExistsError(path)
+        header = SampleStoreHeader(
+            bracket_hash=bracket_hash(bracket),
+            model_name=type(model).__name__,
+            model_params=model.model_dump(mode="json"),
+            num_games=len(bracket.games),
+            row_bytes=(len(bracket.games) + 7) // 8,
+            bracket=bracket,
+        )
+        header_bytes = header.model_dump_json().encode()
+        prefix = MAGIC + len(header_bytes).to_bytes(4, "little") + header_bytes
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(prefix.ljust(_padded(len(prefix)), b" "))
+        return cls(path)
+
+    @property
+    def bracket(self) -> Bracket:
+        return self.header.bracket
+
+    def __len__(self) -> int:
+        return (self.path.stat().st_size - self.data_offset) // self.header.row_bytes
+
+    def matches(self, bracket: Bracket, model: WinProbabilityModel) -> bool:
+        """Whether these samples were simulated from `bracket` under `model`."""
+        return (
+            self.header.bracket_hash == bracket_hash(bracket)
+            and self.header.model_name == type(model).__name__
+            and self.header.model_params == model.model_dump(mode="json")
+        )
+
+    def append(self, outcomes: np.ndarray) -> None:
+        """Add `(sim_count, num_games)` simulated winner indices to the end."""
+        if outcomes.shape[1] != self.header.num_games:
+            raise ValueError(
+                f"Expected {self.header.num_games} games, got {outcomes.shape[1]}"
+            )
+        packed = pack_outcomes(self.bracket, outcomes)
+        with open(self.path, "r+b") as file:
+            # Overwrite any partly written row instead of appending after it.
+            file.seek(self.data_offset + len(self) * self.header.row_bytes)
+            file.write(packed.tobytes())
+            file.truncate()
+
+    def packed(self) -> np.ndarray:
+        """`(len(self), row_bytes)` read-only memory map of the packed rows."""
+        if not len(self):
+            return np.empty((0, self.header.row_bytes), dtype=np.uint8)
+        return np.memmap(
+            self.path,
+            dtype=np.uint8,
+            mode="r",
+            offset=self.data_offset,
+            shape=(len(self), self.header.row_bytes),
+        )
+
+    def outcomes(self, start: int = 0, stop: int | None = None) -> np.ndarray:
+        """Unpacked winner indices of samples `start` to `stop`."""
+        return unpack_outcomes(self.bracket, self.packed()[start:stop])
+
+
+def _padded(length: int) -> int:
+    return -(-length // HEADER_ALIGNMENT) * HEADER_ALIGNMENT
+
+
+def simulate_to_store(
+    path: Path,
+    bracket: Bracket,
+    sim_count: int,
+    *,
+    model: WinProbabilityModel = EloStyle(),
+    seed: int | None = None,
+    batch_size: int = 1_000_000,
+) -> SampleStore:
+    """Simulate `sim_count` tournaments into the store at `path`, in batches.
+
+    Creates the store if needed. Adding to an existing store requires the same
+    bracket and model."""
+    path = Path(path)
+    if path.exists():
+        store = SampleStore(path)
+        if not store.matches(bracket, model):
+            raise ValueError(f"{path} holds samples of a different bracket or model")
+    else:
+        store = SampleStore.create(path, bracket, model)
+
+    rng = np.random.default_rng(seed)
+    probabilities = model.matrix(bracket)
+    for start in range(0, sim_count, batch_size):
+        batch_count = min(batch_size, sim_count - start)
+        store.append(simulate_outcomes(bracket, probabilities, batch_count, rng=rng))
+    return store
+
+
+if __name__ == "__main__":
+    import time
+
+    from march_madness import get_bracket
+    from march_madness.group import Group
+    from march_madness.vectorized import pick_matrix, score_matrix
+
+    bracket = get_bracket()
+    for game in bracket.games[48:]:
+        game.winner_index = None
+        if game.round_of < 16:
+            game.team1_index = game.team2_index = None
+
+    path = sample_folder / f"{bracket_hash(bracket)[:12]}.samples"
+    path.unlink(missing_ok=True)
+    start = time.monotonic()
+    store = simulate_to_store(path, bracket, 10_000_000, seed=40351)
+    print(
+        f"Stored {len(store):,} tournaments in {path.stat().st_size / 1e6:.1f} MB "
+        f"({time.monotonic() - start:.1f}s)"
+    )
+
+    # Score a group against stored samples without re-simulating.
+    group = Group.load()
+    outcomes = store.outcomes(0, 100_000)
+    scores = score_matrix(
+        outcomes, pick_matrix(group.entries), np.array(bracket.topology().points)
+    )
+    for entry, average in zip(group.entries, scores.mean(axis=0)):
+        print(f"{entry.user}: {average:,.1f}")
@@ -0,0 +1,175 @@
+import functools
+import math
+from typing import NamedTuple
+
+import numpy as np
+import pydantic
+
+from march_madness.bracket import Bracket, bracket_topology
+
+ESPN_ROUND_POINTS = (10.0, 20.0, 40.0, 80.0, 160.0, 320.0)
+"""Round of 64 through the championship."""
+MAX_SEED = 16
+
+
+class ScoringWeights(NamedTuple):
+    """A `ScoringSystem` compiled for one field shape. Indexed by game id."""
+
+    game_points: np.ndarray
+    """`(num_games,)` points for a correct pick, whoever wins."""
+    seed_points: np.ndarray
+    """`(num_games, MAX_SEED + 1)` extra points for a correct pick, by winner's seed."""
+    upset_points: np.ndarray
+    """`(num_games,)` extra points per seed line the winner is below the loser."""
+
+
+class ScoringSystem(pydantic.BaseModel):
+    """How many points each correct pick is worth.
+
+    The base system is ESPN's 10-20-40-80-160-320, with `round_points` listed through
+    the championship (so smaller fields use the last rounds) and nothing for First
+    Four games. Subclasses change `_compile` to add seed-dependent points. With
+    `tiebreaker`, tied entries are separated by how close their
+    `predicted_final_score` is to the bracket's `final_total_score`."""
+
+    model_config = pydantic.ConfigDict(frozen=True)
+
+    round_points: tuple[float, ...] = ESPN_ROUND_POINTS
+    tiebreaker: bool = True
+
+    def weights(self, bracket: Bracket) -> ScoringWeights:
+        return _compiled_weights(self, len(bracket.teams), tuple(bracket.play_in_slots))
+
+    def _compile(self, round_of: np.ndarray, main_size: int) -> ScoringWeights:
+        round_points = np.zeros(len(round_of))
+        for game_id, game_round_of in enumerate(round_of):
+            if game_round_of <= main_size:
+                round_points[game_id] = self.round_points[
+                    -int(math.log2(game_round_of))
+                ]
+        return ScoringWeights(
+            game_points=round_points,
+            seed_points=np.zeros((len(round_of), MAX_SEED + 1)),
+            upset_points=np.zeros(len(round_of)),
+        )
+
+    def points(self, bracket: Bracket, outcomes: np.ndarray) -> np.ndarray:
+        """Points for picking the winner of each game of each simulated tournament.
+
+        `(num_games,)` if they don't depend on who won, else `(sim_count, num_games)`.
+        """
+        weights = self.weights(bracket)
+        if not weights.seed_points.any() and not weights.upset_points.any():
+            return weights.game_points
+
+        seeds = np.array([team.seed for team in bracket.teams])
+        winner_seeds = seeds[outcomes]
+        points = (
+            weights.game_points
+            + weights.seed_points[np.arange(outcomes.shape[1]), winner_seeds]
+        )
+        if weights.upset_points.any():
+            from march_madness.vectorized import contestants
+
+            game_ids = list(range(outcomes.shape[1]))
+            team1 = contestants(bracket, outcomes, game_ids, side=0)
+            team2 = contestants(bracket, outcomes, game_ids, side=1)
+            loser_seeds = seeds[np.where(outcomes == team1, team2, team1)]
+            points += weights.upset_points * np.maximum(winner_seeds - loser_seeds, 0)
+        return points
+
+    def score_matrix(
+        self,
+        bracket: Bracket,
+        outcomes: np.ndarray,
+        picks: np.ndarray,
+    ) -> np.ndarray:
+        """`(sim_count, num_entries)` score of each entry in each simulation."""
+        from march_madness.vectorized import score_matrix
+
+        return score_matrix(outcomes, picks, self.points(bracket, outcomes))
+
+    def game_points(self, actual: Bracket) -> list[float]:
+        """Points a correct pick of each game of `actual` earns. 0 if undecided."""
+        game_points, seed_points, upset_points = _weight_lists(
+            self, len(actual.teams), tuple(actual.play_in_slots)
+        )
+        points = [0.0] * len(actual.games)
+        for game in actual.games:
+            if game.winner_index is None:
+                continue
+            winner_seed = actual.teams[game.winner_index].seed
+            loser_index = (
+                game.team2_index
+                if game.winner_index == game.team1_index
+                else game.team1_index
+            )
+            loser_seed = actual.teams[loser_index].seed
+            points[game.game_id] = (
+                game_points[game.game_id]
+                + seed_points[game.game_id][winner_seed]
+                + upset_points[game.game_id] * max(winner_seed - loser_seed, 0)
+            )
+        return points
+
+    def score(self, actual: Bracket, picked: Bracket) -> float:
+        """Score of `picked` against the decided games of `actual`."""
+        return sum(
+            points
+            for points, game, picked_game in zip(
+                self.game_points(actual), actual.games, picked.games
+            )
+            if game.winner_index is not None
+            and game.winner_index == picked_game.winner_index
+        )
+
+
+@functools.cache
+def _compiled_weights(
+    scoring: ScoringSystem,
+    num_teams: int,
+    play_in_slots: tuple[int, ...],
+) -> ScoringWeights:
+    round_of = np.array(bracket_topology(num_teams, play_in_slots).round_of)
+    weights = scoring._compile(round_of, num_teams - len(play_in_slots))
+    for array in weights:
+        array.setflags(write=False)
+    return weights
+
+
+@functools.cache
+def _weight_lists(
+    scoring: ScoringSystem,
+    num_teams: int,
+    play_in_slots: tuple[int, ...],
+) -> tuple[list, ...]:
+    """`_compiled_weights` as lists, which are faster to index one game at a time."""
+    weights = _compiled_weights(scoring, num_teams, play_in_slots)
+    return tuple(array.tolist() for array in weights)
+
+
+class SeedMultiplied(ScoringSystem):
+    """Round points times the winner's seed: a correct 12-over-5 pick is worth 12x."""
+
+    def _compile(self, round_of: np.ndarray, main_size: int) -> ScoringWeights:
+        weights = super()._compile(round_of, main_size)
+        return weights._replace(
+            game_points=np.zeros(len(round_of)),
+            seed_points=weights.game_points[:, None] * np.arange(MAX_SEED + 1),
+        )
+
+
+class UpsetBonus(ScoringSystem):
+    """Round points, plus `bonus_per_seed` for each seed line the winner is below
+    the team they beat."""
+
+    bonus_per_seed: float = 5.0
+
+    def _compile(self, round_of: np.ndarray, main_size: int) -> ScoringWeights:
+        weights = super()._compile(round_of, main_size)
+        return weights._replace(
+            upset_points=np.where(weights.game_points > 0, self.bonus_per_seed, 0.0)
+        )
+
+
+ESPN = ScoringSystem()
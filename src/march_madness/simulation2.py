@@ -2,7 +2,7 @@ from collections import Counter
 from typing import Callable
 
 from march_madness import Bracket, Game, get_bracket
-from march_madness.simulation import elo_style, sim
+from march_madness.simulation import elo_style, rand, sim
 
 
 class Simulation:
@@ -14,6 +14,7 @@ class Simulation:
         sim_count: int = 100,
         callback: Callable[[Bracket], None] | None = None,
         suppress_print: bool = False,
+        seed: int | None = None,
     ):
         self.bracket = bracket
         self.sim_game_function = sim_game_function
@@ -21,6 +22,8 @@ class Simulation:
         self._results: dict[int, Counter[int, int]] = {}
         self.callback = callback
         self._suppress_print = suppress_print
+        self.seed = seed
+        """Reseeds the shared `rand` before simulating, if given."""
         self._do_sim()
 
     def results(self, game_id: int) -> list[tuple[str, float]]:
@@ -55,6 +58,8 @@ class Simulation:
         self,
     ) -> None:
         self._results = {game.game_id: Counter() for game in self.bracket.games}
+        if self.seed is not None:
+            rand.seed(self.seed)
 
         for index in range(self.sim_count):
             if index % 100 == 0 or index == self.sim_count - 1:
@@ -0,0 +1,156 @@
+from typing import Iterator, NamedTuple
+
+import numpy as np
+
+from march_madness import Bracket, get_bracket
+from march_madness.group import Group
+from march_madness.scoring import ESPN, ScoringSystem
+from march_madness.vectorized import pick_matrix, simulate_outcomes, win_shares
+from march_madness.win_probability import EloStyle, WinProbabilityModel
+
+Z_95 = 1.959964
+"""Standard normal quantile for a two-sided 95% confidence interval."""
+
+
+def standard_error(probability: np.ndarray | float, sim_count: int) -> np.ndarray:
+    """Standard error of a probability estimated from `sim_count` simulations."""
+    return np.sqrt(np.asarray(probability) * (1 - np.asarray(probability)) / sim_count)
+
+
+def confidence_interval(probability: float, sim_count: int) -> tuple[float, float]:
+    """Normal-approximation 95% confidence interval, clamped to [0, 1]."""
+    margin = Z_95 * float(standard_error(probability, sim_count))
+    return max(0.0, probability - margin), min(1.0, probability + margin)
+
+
+class SimulationProgress(NamedTuple):
+    """Running results after some number of simulations."""
+
+    bracket: Bracket
+    sim_count: int
+    game_probabilities: np.ndarray
+    """`(num_games, num_teams)` chance of each team winning each game."""
+    winner_probabilities: dict[str | None, float]
+    """Chance of each user winning the group. Empty without a group."""
+    average_scores: dict[str, float]
+
+    @property
+    def game_standard_errors(self) -> np.ndarray:
+        return standard_error(self.game_probabilities, self.sim_count)
+
+    @property
+    def winner_standard_errors(self) -> dict[str | None, float]:
+        return {
+            user: float(standard_error(probability, self.sim_count))
+            for user, probability in self.winner_probabilities.items()
+        }
+
+    @property
+    def max_standard_error(self) -> float:
+        """Largest standard error of any reported probability."""
+        standard_errors = [float(self.game_standard_errors.max(initial=0))]
+        standard_errors.extend(self.winner_standard_errors.values())
+        return max(standard_errors)
+
+    def results(self, game_id: int) -> list[tuple[str, float, tuple[float, float]]]:
+        """Like `Simulation.results`, plus a 95% confidence interval for each team."""
+        probabilities = self.game_probabilities[game_id]
+        team_indexes = sorted(
+            np.flatnonzero(probabilities), key=lambda index: -probabilities[index]
+        )
+        return [
+            (
+                self.bracket.teams[index].name,
+                float(probabilities[index]),
+                confidence_interval(float(probabilities[index]), self.sim_count),
+            )
+            for index in team_indexes
+        ]
+
+
+def stream_simulation(
+    bracket: Bracket,
+    *,
+    model: WinProbabilityModel = EloStyle(),
+    group: Group | None = None,
+    batch_size: int = 10_000,
+    max_sim_count: int = 1_000_000,
+    target_precision: float | None = None,
+    seed: int | None = None,
+    scoring: ScoringSystem = ESPN,
+) -> Iterator[SimulationProgress]:
+    """Simulate in batches of `batch_size`, yielding the running results after each.
+
+    Stops after `max_sim_count` simulations, or as soon as every reported probability
+    has a standard error below `target_precision`. Entries tied for the win split
+    it."""
+    rng = np.random.default_rng(seed)
+    probabilities = model.matrix(bracket)
+    num_teams = len(bracket.teams)
+
+    if group is not None:
+        users = [entry.user for entry in group.entries]
+        picks = pick_matrix(group.entries)
+        total_scores = np.zeros(len(users))
+        # The last element counts simulations nobody won.
+        win_counts = np.zeros(len(users) + 1)
+
+    game_counts = np.zeros((len(bracket.games), num_teams), dtype=np.int64)
+    sim_count = 0
+    while sim_count < max_sim_count:
+        batch_sim_count = min(batch_size, max_sim_count - sim_count)
+        outcomes = simulate_outcomes(bracket, probabilities, batch_sim_count, rng=rng)
+        sim_count += batch_sim_count
+        for game_id in range(len(bracket.games)):
+            game_counts[game_id] += np.bincount(
+                outcomes[:, game_id], minlength=num_teams
+            )
+
+        winner_probabilities = {}
+        average_scores = {}
+        if group is not None:
+            scores = scoring.score_matrix(bracket, outcomes, picks)
+            total_scores += scores.sum(axis=0)
+            shares = win_shares(scores)
+            win_counts[:-1] += shares.sum(axis=0)
+            win_counts[-1] += batch_sim_count - np.count_nonzero(shares.any(axis=1))
+            winner_probabilities = {
+                user: float(count / sim_count)
+                for user, count in zip(users + [None], win_counts)
+                if count
+            }
+            average_scores = {
+                user: float(total_score / sim_count)
+                for user, total_score in zip(users, total_scores)
+            }
+
+        progress = SimulationProgress(
+            bracket=bracket,
+            sim_count=sim_count,
+            game_probabilities=game_counts / sim_count,
+            winner_probabilities=winner_probabilities,
+            average_scores=average_scores,
+        )
+        yield progress
+        if (
+            target_precision is not None
+            and progress.max_standard_error < target_precision
+        ):
+            return
+
+
+if __name__ == "__main__":
+    for progress in stream_simulation(
+        get_bracket(), group=Group.load(), target_precision=0.002, seed=40351
+    ):
+        print(
+            f"{progress.sim_count:>9,} sims: "
+            f"max standard error {progress.max_standard_error * 100:.3f}%"
+        )
+    for user, probability in sorted(
+        progress.winner_probabilities.items(), key=lambda item: -item[1]
+    ):
+        low, high = confidence_interval(probability, progress.sim_count)
+        print(
+            f"{user}: {probability * 100:.2f}% ({low * 100:.2f}% - {high * 100:.2f}%)"
+        )
@@ -0,0 +1,101 @@
+from typing import NamedTuple
+
+import numpy as np
+
+from march_madness import Bracket, Game
+from march_madness.group import Group
+from march_madness.scoring import ESPN, ScoringSystem
+from march_madness.vectorized import BatchSimGroup, uniform_draws, win_shares
+from march_madness.win_probability import EloStyle, WinProbabilityModel
+
+
+class ScenarioComparison(NamedTuple):
+    """Group win probabilities if `team1` wins a game vs if `team2` does."""
+
+    game_id: int
+    team1_winner_prob: dict[str, float]
+    team2_winner_prob: dict[str, float]
+    difference: dict[str, float]
+    """`team2_winner_prob - team1_winner_prob` for each user."""
+    standard_error: dict[str, float]
+    """Standard error of `difference`."""
+    variance_reduction: dict[str, float]
+    """How many times smaller the variance of `difference` is than it would be with
+    two independent runs of the same size."""
+
+
+def _paired_standard_error(samples: np.ndarray, antithetic: bool) -> float:
+    """Standard error of the mean of `samples`, averaging antithetic pairs first."""
+    if antithetic:
+        half = len(samples) // 2
+        samples = (samples[:half] + samples[half:]) / 2
+    return float(samples.std(ddof=1) / np.sqrt(len(samples)))
+
+
+def compare_winners(
+    group: Group,
+    bracket: Bracket,
+    game: Game,
+    sim_count: int = 10_000,
+    *,
+    model: WinProbabilityModel = EloStyle(),
+    seed: int | None = None,
+    antithetic: bool = True,
+    scoring: ScoringSystem = ESPN,
+) -> ScenarioComparison:
+    """Simulate both results of `game` with common random numbers.
+
+    Both scenarios use the same uniform draw for each game slot of each simulation, so
+    most of the simulations play out the same way and the difference between them is
+    mostly signal. With `antithetic`, half the draws mirror the other half. Entries
+    tied for the win split it."""
+    draws = uniform_draws(
+        sim_count, len(bracket.games), np.random.default_rng(seed), antithetic
+    )
+    users = [entry.user for entry in group.entries]
+
+    wins = []
+    for winner_index in [game.team1_index, game.team2_index]:
+        scenario = bracket.clone()
+        scenario.advance_winner(scenario.games[game.game_id], winner_index)
+        sim_group = BatchSimGroup(
+            group=group,
+            current_bracket=scenario,
+            sim_count=sim_count,
+            suppress_print=True,
+            model=model,
+            draws=draws,
+            scoring=scoring,
+        )
+        wins.append(win_shares(sim_group.scores))
+    team1_wins, team2_wins = wins
+
+    standard_error = {}
+    variance_reduction = {}
+    for index, user in enumerate(users):
+        difference = team2_wins[:, index] - team1_wins[:, index]
+        standard_error[user] = _paired_standard_error(difference, antithetic)
+        independent_variance = (
+            team1_wins[:, index].var(ddof=1) + team2_wins[:, index].var(ddof=1)
+        ) / sim_count
+        if not independent_variance:
+            variance_reduction[user] = 1.0
+        elif not standard_error[user]:
+            variance_reduction[user] = float("inf")
+        else:
+            variance_reduction[user] = float(
+                independent_variance / standard_error[user] ** 2
+            )
+
+    team1_winner_prob = dict(zip(users, team1_wins.mean(axis=0).tolist()))
+    team2_winner_prob = dict(zip(users, team2_wins.mean(axis=0).tolist()))
+    return ScenarioComparison(
+        game_id=game.game_id,
+        team1_winner_prob=team1_winner_prob,
+        team2_winner_prob=team2_winner_prob,
+        difference={
+            user: team2_winner_prob[user] - team1_winner_prob[user] for user in users
+        },
+        standard_error=standard_error,
+        variance_reduction=variance_reduction,
+    )
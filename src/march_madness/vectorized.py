@@ -0,0 +1,308 @@
+from collections import Counter
+
+import numpy as np
+
+from march_madness import Bracket
+from march_madness.group import BracketEntry, Group, SimGroup
+from march_madness.scoring import ESPN, ScoringSystem
+from march_madness.simulation2 import Simulation
+from march_madness.win_probability import EloStyle, WinProbabilityModel
+
+
+def contestants(
+    bracket: Bracket,
+    outcomes: np.ndarray,
+    game_ids: list[int],
+    side: int,
+) -> np.ndarray:
+    """`team1` (`side == 0`) or `team2` (`side == 1`) of each game in every simulation."""
+    topology = bracket.topology()
+    teams = np.empty((outcomes.shape[0], len(game_ids)), dtype=np.int8)
+    for column, game_id in enumerate(game_ids):
+        previous_game_id = topology.previous_game_ids[game_id][side]
+        if previous_game_id is None:
+            game = bracket.games[game_id]
+            teams[:, column] = game.team2_index if side else game.team1_index
+        else:
+            teams[:, column] = outcomes[:, previous_game_id]
+    return teams
+
+
+def uniform_draws(
+    sim_count: int,
+    num_games: int,
+    rng: np.random.Generator | None = None,
+    antithetic: bool = False,
+) -> np.ndarray:
+    """`(sim_count, num_games)` uniform draws, one per game slot of each simulation.
+
+    Passing the same draws to `simulate_outcomes` for several scenarios gives common
+    random numbers. With `antithetic`, the second half of the simulations mirrors the
+    first (`u` and `1 - u`)."""
+    rng = rng or np.random.default_rng()
+    if not antithetic:
+        return rng.random((sim_count, num_games))
+    if sim_count % 2:
+        raise ValueError("Antithetic draws need an even sim_count")
+    half = rng.random((sim_count // 2, num_games))
+    return np.concatenate([half, 1 - half])
+
+
+def simulate_outcomes(
+    bracket: Bracket,
+    probabilities: np.ndarray,
+    sim_count: int,
+    rng: np.random.Generator | None = None,
+    draws: np.ndarray | None = None,
+) -> np.ndarray:
+    """Simulate `sim_count` tournaments at once.
+
+    Returns an `(sim_count, len(bracket.games))` array of winner indices. Games that
+    already have a winner in `bracket` keep it in every simulation. `team1` wins when
+    its draw is below its win probability; `draws[:, game_id]` (see `uniform_draws`)
+    is used if given, otherwise fresh draws from `rng`."""
+    rng = rng or np.random.default_rng()
+    outcomes = np.full((sim_count, len(bracket.games)), -1, dtype=np.int8)
+
+    for game_ids in bracket.topology().rounds:
+        undecided = []
+        for game_id in game_ids:
+            winner_index = bracket.games[game_id].winner_index
+            if winner_index is None:
+                undecided.append(game_id)
+            else:
+                outcomes[:, game_id] = winner_index
+        if undecided:
+            team1 = contestants(bracket, outcomes, undecided, side=0)
+            team2 = contestants(bracket, outcomes, undecided, side=1)
+            team1_win_prob = probabilities[team1, team2]
+            if draws is None:
+                game_draws = rng.random(team1_win_prob.shape)
+            else:
+                game_draws = draws[:, undecided]
+            outcomes[:, undecided] = np.where(game_draws < team1_win_prob, team1, team2)
+    return outcomes
+
+
+def winner_counts(outcomes: np.ndarray, num_teams: int) -> dict[int, Counter[int, int]]:
+    """Per-game winner counts, in the same shape as `Simulation._results`."""
+    results = {}
+    for game_id in range(outcomes.shape[1]):
+        counts = np.bincount(outcomes[:, game_id], minlength=num_teams)
+        results[game_id] = Counter(
+            {
+                int(team_index): int(counts[team_index])
+                for team_index in np.flatnonzero(counts)
+            }
+        )
+    return results
+
+
+def pick_matrix(entries: list[BracketEntry]) -> np.ndarray:
+    """`(len(entries), num_games)` winner indices picked by each entry."""
+    if not entries:
+        raise ValueError("No entries to build a pick matrix from")
+    picks = np.full((len(entries), len(entries[0].bracket.games)), -1, dtype=np.int8)
+    for entry_index, entry in enumerate(entries):
+        for game in entry.bracket.games:
+            if game.winner_index is not None:
+                picks[entry_index, game.game_id] = game.winner_index
+    return picks
+
+
+def cluster_pick_matrix(group: Group) -> tuple[np.ndarray, np.ndarray]:
+    """`pick_matrix` of each of `group.clusters()`, and the cluster of each entry."""
+    clusters = group.clusters()
+    cluster_indexes = {
+        id(entry): cluster_index
+        for cluster_index, cluster in enumerate(clusters)
+        for entry in cluster.entries
+    }
+    picks = np.array(
+        [
+            [-1 if pick is None else pick for pick in cluster.picks]
+            for cluster in clusters
+        ],
+        dtype=np.int8,
+    )
+    return picks, np.array([cluster_indexes[id(entry)] for entry in group.entries])
+
+
+def score_matrix(
+    outcomes: np.ndarray,
+    picks: np.ndarray,
+    points: np.ndarray,
+) -> np.ndarray:
+    """Score every entry against every simulated tournament.
+
+    `outcomes` is `(sim_count, num_games)`, `picks` is `(num_entries, num_games)` and
+    `points` is `(num_games,)`, or `(sim_count, num_games)` when the points depend on
+    who won (see `ScoringSystem.points`). Returns the `(sim_count, num_entries)`
+    scores, the same as `Bracket.score` for each pair."""
+    scores = np.empty((outcomes.shape[0], picks.shape[0]))
+    # One entry at a time keeps the comparisons on contiguous rows of `outcomes`.
+    for entry_index, entry_picks in enumerate(picks):
+        correct = outcomes == entry_picks
+        if points.ndim == 1:
+            scores[:, entry_index] = correct @ points
+        else:
+            scores[:, entry_index] = (correct * points).sum(axis=1)
+    return scores
+
+
+def winner_indexes(scores: np.ndarray) -> np.ndarray:
+    """Index of the winning entry in each simulation, or -1 if nobody scored.
+
+    Ties go to the earliest entry. See `win_shares` to split them instead."""
+    winners = np.argmax(scores, axis=1)
+    return np.where(scores.max(axis=1) > 0, winners, -1)
+
+
+def win_shares(scores: np.ndarray) -> np.ndarray:
+    """`(sim_count, num_entries)` share of each simulation each entry won.
+
+    Like `SimGroup._callback`, entries tied for the best score split the win evenly,
+    and nobody wins (the row is all zeros) if nobody scored."""
+    best = scores.max(axis=1, keepdims=True)
+    is_top = (scores == best) & (best > 0)
+    return is_top / np.maximum(is_top.sum(axis=1, keepdims=True), 1)
+
+
+class BatchSimulation(Simulation):
+    """A `Simulation` that draws every tournament at once with NumPy.
+
+    Instead of walking the `Game` objects of each simulated bracket, one round of
+    games is drawn at a time for all `sim_count` tournaments from a precomputed
+    pairwise win probability matrix."""
+
+    def __init__(
+        self,
+        *,
+        bracket: Bracket,
+        model: WinProbabilityModel = EloStyle(),
+        sim_count: int = 100,
+        seed: int | None = None,
+        suppress_print: bool = False,
+        antithetic: bool = False,
+        draws: np.ndarray | None = None,
+    ):
+        self.model = model
+        self.antithetic = antithetic
+        self.draws = draws
+        """Shared uniform draws (see `uniform_draws`) for common random numbers."""
+        self.outcomes: np.ndarray | None = None
+        """`(sim_count, len(bracket.games))` winner indices of every simulation."""
+        super().__init__(
+            bracket=bracket,
+            sim_count=sim_count,
+            suppress_print=suppress_print,
+            seed=seed,
+        )
+
+    def _do_sim(self) -> None:
+        if not self._suppress_print:
+            print(f"Simulating {self.sim_count:,} brackets")
+        rng = np.random.default_rng(self.seed)
+        draws = self.draws
+        if draws is None and self.antithetic:
+            draws = uniform_draws(
+                self.sim_count, len(self.bracket.games), rng, antithetic=True
+            )
+        self.outcomes = simulate_outcomes(
+            self.bracket,
+            self.model.matrix(self.bracket),
+            self.sim_count,
+            rng=rng,
+            draws=draws,
+        )
+        self._results = winner_counts(self.outcomes, len(self.bracket.teams))
+
+
+class BatchSimGroup(SimGroup):
+    """A `SimGroup` that scores every entry against every simulation at once.
+
+    The entries' picks are stacked into one matrix and the simulated tournaments into
+    another, so scoring is a masked, weighted comparison instead of a `Bracket.score`
+    call per entry per simulation."""
+
+    def __init__(
+        self,
+        group: Group,
+        current_bracket: Bracket,
+        sim_count: int = 100,
+        suppress_print: bool = False,
+        seed: int | None = None,
+        model: WinProbabilityModel = EloStyle(),
+        antithetic: bool = False,
+        draws: np.ndarray | None = None,
+        scoring: ScoringSystem = ESPN,
+    ) -> None:
+        self.model = model
+        self.antithetic = antithetic
+        self.draws = draws
+        self.outcomes: np.ndarray | None = None
+        """`(sim_count, len(current_bracket.games))` winner indices of every simulation."""
+        self.scores: np.ndarray | None = None
+        """`(sim_count, len(group.entries))` score of each entry in each simulation."""
+        self._cluster_picks, self._entry_clusters = cluster_pick_matrix(group)
+        super().__init__(
+            group=group,
+            current_bracket=current_bracket,
+            sim_count=sim_count,
+            suppress_print=suppress_print,
+            seed=seed,
+            scoring=scoring,
+        )
+
+    def _do_sim(self):
+        sim = BatchSimulation(
+            bracket=self.current_bracket,
+            model=self.model,
+            sim_count=self.sim_count,
+            seed=self.seed,
+            suppress_print=self._suppress_print,
+            antithetic=self.antithetic,
+            draws=self.draws,
+        )
+        self.outcomes = sim.outcomes
+        self.scores = self._score(self.outcomes)
+        self._tally()
+
+    def _score(self, outcomes: np.ndarray) -> np.ndarray:
+        """Score each distinct bracket once, then copy the scores to its entries."""
+        cluster_scores = self.scoring.score_matrix(
+            self.current_bracket, outcomes, self._cluster_picks
+        )
+        return cluster_scores[:, self._entry_clusters]
+
+    def _tally(self) -> None:
+        """Recompute the totals and summaries from `self.scores`."""
+        total_scores = self.scores.sum(axis=0)
+        shares = win_shares(self.scores)
+        wins = shares.sum(axis=0)
+        self._winner_counter.clear()
+        for index, entry in enumerate(self.group.entries):
+            self._user_total_scores[entry.user] = float(total_scores[index])
+            if wins[index]:
+                self._winner_counter[entry.user] = float(wins[index])
+        no_winner_count = self.sim_count - int(np.count_nonzero(shares.any(axis=1)))
+        if no_winner_count:
+            self._winner_counter[None] = no_winner_count
+        self._summarize()
+
+
+if __name__ == "__main__":
+    import time
+
+    from march_madness import INITIAL_BRACKET_PATH
+    from march_madness.kenpom import update_bracket_kenpoms
+
+    # Simulate from before the tournament so every game is undecided.
+    bracket = Bracket.model_validate_json(INITIAL_BRACKET_PATH.read_text())
+    update_bracket_kenpoms(bracket)
+
+    start = time.monotonic()
+    simulation = BatchSimulation(bracket=bracket, sim_count=100_000, seed=40351)
+    end = time.monotonic()
+    print(f"Time: {end - start:.2f}s for {simulation.sim_count:,} sims")
+    print(simulation.pretty_results(62, cutoff=10))
@@ -0,0 +1,30 @@
+from pathlib import Path
+
+import pytest
+
+from march_madness import Bracket, get_bracket
+from march_madness.group import Group
+
+ROOT = Path(__file__).parent.parent
+
+
+@pytest.fixture(autouse=True)
+def repo_root(monkeypatch):
+    """The package reads its fixtures from `data/`, relative to the repo root."""
+    monkeypatch.chdir(ROOT)
+
+
+@pytest.fixture
+def bracket(repo_root) -> Bracket:
+    """The real bracket with the Elite Eight onwards undecided, so sims are quick."""
+    bracket = get_bracket()
+    for game in bracket.games[56:]:
+        game.winner_index = None
+        if game.round_of < 8:
+            game.team1_index = game.team2_index = None
+    return bracket
+
+
+@pytest.fixture
+def group(repo_root) -> Group:
+    return Group.load()
@@ -0,0 +1,120 @@
+import numpy as np
+import pytest
+
+from march_madness import Bracket, Team
+from march_madness.bracket import bracket_topology
+from march_madness.simulation import random_winner, sim
+from march_madness.vectorized import BatchSimulation
+
+PLAY_IN_SLOTS = [15, 31, 34, 50]
+
+
+def make_bracket(num_teams: int, play_in_slots: tuple[int, ...] = ()) -> Bracket:
+    teams = [
+        Team(name=f"Team {index}", seed=index % 16 + 1, region="East", kenpom=-index)
+        for index in range(num_teams)
+    ]
+    return Bracket(teams=teams, play_in_slots=list(play_in_slots))
+
+
+def ladder_next_game(game_id: int, round_of: int) -> tuple[int | None, bool]:
+    """Where the winner of a 64-team game went before `bracket_topology`."""
+    round_starts = {64: 0, 32: 32, 16: 48, 8: 56, 4: 60, 2: 62}
+    if round_of == 2:
+        return None, False
+    within_round_index = game_id - round_starts[round_of]
+    next_game_id = round_starts[round_of // 2] + within_round_index // 2
+    return next_game_id, within_round_index % 2 == 0
+
+
+def assert_complete(bracket: Bracket) -> None:
+    """Every game has a winner who played in it and moved on to the right slot."""
+    topology = bracket.topology()
+    for game in bracket.games:
+        assert game.winner_index in (game.team1_index, game.team2_index)
+        next_game_id = topology.next_game_id[game.game_id]
+        if next_game_id is None:
+            continue
+        next_game = bracket.games[next_game_id]
+        if topology.next_is_team1[game.game_id]:
+            assert next_game.team1_index == game.winner_index
+        else:
+            assert next_game.team2_index == game.winner_index
+
+
+def test_64_team_topology_matches_ladder(bracket):
+    topology = bracket.topology()
+
+    assert len(bracket.games) == 63
+    for game in bracket.games:
+        next_game_id, next_is_team1 = ladder_next_game(game.game_id, game.round_of)
+        assert topology.round_of[game.game_id] == game.round_of
+        assert topology.next_game_id[game.game_id] == next_game_id
+        if next_game_id is not None:
+            assert topology.next_is_team1[game.game_id] == next_is_team1
+        assert topology.points[game.game_id] == 640 / game.round_of
+    assert [len(game_ids) for game_ids in topology.rounds] == [32, 16, 8, 4, 2, 1]
+
+
+def test_64_team_games_start_from_pairs():
+    bracket = make_bracket(64)
+
+    for game in bracket.games[:32]:
+        assert (game.team1_index, game.team2_index) == (
+            2 * game.game_id,
+            2 * game.game_id + 1,
+        )
+    assert all(game.team1_index is None for game in bracket.games[32:])
+
+
+def test_play_in_games_come_first():
+    bracket = make_bracket(68, PLAY_IN_SLOTS)
+    topology = bracket.topology()
+
+    assert len(bracket.games) == 67
+    assert topology.rounds[0] == (0, 1, 2, 3)
+    assert all(game.round_of == 68 for game in bracket.games[:4])
+    assert topology.points[:4] == (0.0,) * 4
+    # Each First Four winner fills its slot of the round of 64.
+    for game_id, slot in enumerate(PLAY_IN_SLOTS):
+        next_game_id = topology.next_game_id[game_id]
+        assert next_game_id == 4 + slot // 2
+        assert topology.next_is_team1[game_id] == (slot % 2 == 0)
+
+
+def test_68_team_field_simulates_to_full_bracket():
+    bracket = make_bracket(68, PLAY_IN_SLOTS)
+
+    assert_complete(sim(bracket, random_winner))
+
+    outcomes = BatchSimulation(
+        bracket=bracket, sim_count=100, seed=1, suppress_print=True
+    ).outcomes
+    assert (outcomes >= 0).all()
+    for game_id, (team1_index, team2_index) in enumerate(
+        bracket.topology().initial_team_indexes[:4]
+    ):
+        assert np.isin(outcomes[:, game_id], [team1_index, team2_index]).all()
+
+
+@pytest.mark.parametrize("num_teams", [4, 8, 16])
+def test_small_fields(num_teams):
+    bracket = make_bracket(num_teams)
+    topology = bracket.topology()
+
+    assert len(bracket.games) == num_teams - 1
+    assert topology.round_of[0] == num_teams
+    assert topology.round_of[-1] == 2
+    assert topology.points[-1] == 320
+    assert_complete(sim(bracket, random_winner))
+
+    outcomes = BatchSimulation(
+        bracket=bracket, sim_count=100, seed=1, suppress_print=True
+    ).outcomes
+    assert np.isin(outcomes[:, -1], range(num_teams)).all()
+
+
+@pytest.mark.parametrize("num_teams, play_in_slots", [(6, ()), (66, (64, 65))])
+def test_invalid_fields(num_teams, play_in_slots):
+    with pytest.raises(ValueError):
+        bracket_topology(num_teams, play_in_slots)
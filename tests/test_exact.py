@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from march_madness import INITIAL_BRACKET_PATH, Bracket
+from march_madness.enumeration import enumerate_outcomes
+from march_madness.exact import advancement_probabilities
+from march_madness.kenpom import update_bracket_kenpoms
+from march_madness.vectorized import BatchSimulation
+from march_madness.win_probability import EloStyle
+
+SIM_COUNT = 20_000
+
+
+@pytest.fixture
+def initial_bracket(repo_root) -> Bracket:
+    """The bracket before any game was played."""
+    bracket = Bracket.model_validate_json(INITIAL_BRACKET_PATH.read_text())
+    update_bracket_kenpoms(bracket)
+    return bracket
+
+
+def test_each_game_and_round_sums_to_one(initial_bracket):
+    probabilities = advancement_probabilities(initial_bracket)
+
+    np.testing.assert_allclose(probabilities.sum(axis=1), 1)
+    for game_ids in initial_bracket.topology().rounds:
+        # Every team still in it wins at most one game per round.
+        per_team = probabilities[list(game_ids)].sum(axis=0)
+        assert (per_team <= 1 + 1e-9).all()
+        assert per_team.sum() == pytest.approx(len(game_ids))
+
+
+def test_agrees_with_batch_simulation(initial_bracket):
+    probabilities = advancement_probabilities(initial_bracket)
+    outcomes = BatchSimulation(
+        bracket=initial_bracket, sim_count=SIM_COUNT, seed=1, suppress_print=True
+    ).outcomes
+
+    for game_id, game_probabilities in enumerate(probabilities):
+        sampled = np.bincount(outcomes[:, game_id], minlength=len(game_probabilities))
+        sampled = sampled / SIM_COUNT
+        standard_error = np.sqrt(
+            game_probabilities * (1 - game_probabilities) / SIM_COUNT
+        )
+        assert (np.abs(sampled - game_probabilities) <= 5 * standard_error + 1e-3).all()
+
+
+def test_agrees_with_enumerated_champion_odds(bracket):
+    model = EloStyle()
+    probabilities = advancement_probabilities(bracket, model)
+    outcomes, weights = enumerate_outcomes(bracket, model.matrix(bracket))
+
+    champion_odds = np.bincount(
+        outcomes[:, -1], weights=weights, minlength=len(bracket.teams)
+    )
+    np.testing.assert_allclose(probabilities[-1], champion_odds, atol=1e-12)
+    assert weights.sum() == pytest.approx(1)
@@ -0,0 +1,91 @@
+import shutil
+
+import pytest
+
+from march_madness import kenpom_fetch
+from march_madness.kenpom import get_kenpom_data, known_good_html_path
+from march_madness.kenpom_fetch import (
+    HttpSource,
+    RatingsFetcher,
+    RatingsSource,
+    StubRatingsServer,
+)
+
+
+class UnconditionalSource(HttpSource):
+    """Ignores the cached validators, like a server without ETags would."""
+
+    def fetch(self, etag=None, last_modified=None):
+        return super().fetch()
+
+
+@pytest.fixture
+def page(tmp_path):
+    path = tmp_path / "kenpom.html"
+    shutil.copy(known_good_html_path, path)
+    return path
+
+
+@pytest.fixture
+def parse_count(monkeypatch):
+    """Number of times `RatingsFetcher` has parsed a page."""
+    calls = []
+    parse = kenpom_fetch.parse_ratings_html
+
+    def counting_parse(html):
+        calls.append(html)
+        return parse(html)
+
+    monkeypatch.setattr(kenpom_fetch, "parse_ratings_html", counting_parse)
+    return lambda: len(calls)
+
+
+def test_ratings_source_is_abstract():
+    with pytest.raises(TypeError):
+        RatingsSource()
+
+
+def test_first_fetch_parses(page, parse_count):
+    with StubRatingsServer(page) as server:
+        with RatingsFetcher(HttpSource(server.url)) as fetcher:
+            result = fetcher.fetch()
+
+    assert result.changed
+    assert not result.not_modified
+    assert result.table.ratings() == get_kenpom_data()
+    assert parse_count() == 1
+
+
+def test_repeat_fetch_is_not_modified(page, parse_count):
+    with StubRatingsServer(page) as server:
+        with RatingsFetcher(HttpSource(server.url)) as fetcher:
+            fetcher.fetch()
+            result = fetcher.fetch()
+
+    assert result == (False, True, None, None)
+    assert server.request_count == 2
+    assert server.not_modified_count == 1
+    assert parse_count() == 1
+
+
+def test_unchanged_body_skips_parsing(page, parse_count):
+    with StubRatingsServer(page) as server:
+        with RatingsFetcher(UnconditionalSource(server.url)) as fetcher:
+            fetcher.fetch()
+            result = fetcher.fetch()
+
+    assert result == (False, False, None, None)
+    assert server.not_modified_count == 0
+    assert parse_count() == 1
+
+
+def test_changed_page_is_parsed_again(page, parse_count):
+    with StubRatingsServer(page) as server:
+        with RatingsFetcher(HttpSource(server.url)) as fetcher:
+            fetcher.fetch()
+            page.write_text(page.read_text().replace("+39.64", "+45.00"))
+            result = fetcher.fetch()
+
+    assert result.changed
+    assert max(result.table.ratings().values()) == 45.0
+    assert parse_count() == 2
@@ -0,0 +1,98 @@
+from collections import Counter
+
+import pytest
+
+from march_madness.group import SimGroup
+from march_madness.parallel import (
+    ParallelSimGroup,
+    ParallelSimulation,
+    shard_seeds,
+    shard_sim_counts,
+)
+from march_madness.simulation2 import Simulation
+
+SIM_COUNT = 200
+WORKERS = 2
+SEED = 1
+
+
+def test_parallel_simulation_merges_shards(bracket):
+    parallel = ParallelSimulation(
+        bracket=bracket,
+        sim_count=SIM_COUNT,
+        seed=SEED,
+        workers=WORKERS,
+        suppress_print=True,
+    )
+
+    expected = {game.game_id: Counter() for game in bracket.games}
+    for sim_count, seed in zip(
+        shard_sim_counts(SIM_COUNT, WORKERS), shard_seeds(SEED, WORKERS)
+    ):
+        shard = Simulation(
+            bracket=bracket, sim_count=sim_count, suppress_print=True, seed=seed
+        )
+        for game_id, counter in shard._results.items():
+            expected[game_id].update(counter)
+
+    assert parallel._results == expected
+    for game in bracket.games:
+        assert sum(parallel._results[game.game_id].values()) == SIM_COUNT
+
+
+def test_parallel_sim_group_merges_shards(bracket, group):
+    parallel = ParallelSimGroup(
+        group=group,
+        current_bracket=bracket,
+        sim_count=SIM_COUNT,
+        seed=SEED,
+        workers=WORKERS,
+        suppress_print=True,
+    )
+
+    total_scores = Counter()
+    winner_counter = Counter()
+    for sim_count, seed in zip(
+        shard_sim_counts(SIM_COUNT, WORKERS), shard_seeds(SEED, WORKERS)
+    ):
+        shard = SimGroup(
+            group=group,
+            current_bracket=bracket,
+            sim_count=sim_count,
+            suppress_print=True,
+            seed=seed,
+        )
+        total_scores.update(shard._user_total_scores)
+        winner_counter.update(shard._winner_counter)
+
+    assert parallel.user_average_scores == {
+        user: total / SIM_COUNT for user, total in total_scores.items()
+    }
+    assert parallel.winner_prob == {
+        user: wins / SIM_COUNT for user, wins in winner_counter.items()
+    }
+    assert sum(parallel.winner_prob.values()) == pytest.approx(1)
+
+
+def test_parallel_runs_are_reproducible(bracket, group):
+    def run_simulation():
+        return ParallelSimulation(
+            bracket=bracket,
+            sim_count=SIM_COUNT,
+            seed=SEED,
+            workers=WORKERS,
+            suppress_print=True,
+        )._results
+
+    def run_sim_group():
+        return ParallelSimGroup(
+            group=group,
+            current_bracket=bracket,
+            sim_count=SIM_COUNT,
+            seed=SEED,
+            workers=WORKERS,
+            suppress_print=True,
+        ).winner_prob
+
+    assert run_simulation() == run_simulation()
+    assert run_sim_group() == run_sim_group()
@@ -0,0 +1,103 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import march_madness
+from march_madness.kenpom import get_kenpom_data
+from march_madness.ratings_history import KEYFRAME_INTERVAL, RatingsHistory
+
+START = datetime(2025, 3, 1, tzinfo=timezone.utc)
+VERSION_COUNT = 2 * KEYFRAME_INTERVAL + 6
+
+
+def versions(base: dict[str, float]) -> list[dict[str, float]]:
+    """`VERSION_COUNT` different ratings, with teams changing, leaving and coming
+    back."""
+    teams = list(base)
+    result = []
+    for version in range(VERSION_COUNT):
+        ratings = dict(base)
+        for offset in range(3):
+            team = teams[(version * 7 + offset) % len(teams)]
+            ratings[team] = round(ratings[team] + version / 100 + offset, 2)
+        if version % 5 == 1:
+            del ratings[teams[-1 - version % 3]]
+        result.append(ratings)
+    return result
+
+
+@pytest.fixture
+def base_ratings(repo_root) -> dict[str, float]:
+    return dict(get_kenpom_data())
+
+
+@pytest.fixture
+def history(tmp_path) -> RatingsHistory:
+    return RatingsHistory(tmp_path / "snapshots")
+
+
+def test_keyframes_and_diffs_rebuild_every_version(history, base_ratings):
+    saved = versions(base_ratings)
+    for index, ratings in enumerate(saved):
+        history.add(ratings, fetched_at=START + timedelta(hours=index))
+
+    # A fresh instance reads everything back from disk.
+    reopened = RatingsHistory(history.folder)
+    snapshots = reopened.snapshots()
+    assert len(snapshots) == VERSION_COUNT
+    for snapshot, ratings in zip(snapshots, saved):
+        keyframe = snapshot.position - snapshot.position % KEYFRAME_INTERVAL
+        assert snapshot.keyframe == keyframe
+        assert reopened.ratings(snapshot) == ratings
+
+
+def test_adding_the_latest_ratings_again_adds_nothing(history, base_ratings):
+    first = history.add(base_ratings, fetched_at=START)
+
+    assert history.add(dict(base_ratings), fetched_at=START + timedelta(1)) == first
+    assert len(history.snapshots()) == 1
+
+
+def test_older_ratings_are_rejected(history, base_ratings):
+    history.add(base_ratings, fetched_at=START)
+    changed = dict(base_ratings, Duke=50.0)
+
+    with pytest.raises(ValueError):
+        history.add(changed, fetched_at=START - timedelta(seconds=1))
+
+
+def test_ratings_as_of_boundaries(history, base_ratings):
+    saved = versions(base_ratings)[:3]
+    for index, ratings in enumerate(saved):
+        history.add(ratings, fetched_at=START + timedelta(hours=index))
+
+    with pytest.raises(LookupError):
+        history.ratings_as_of(START - timedelta(microseconds=1))
+    assert history.ratings_as_of(START) == saved[0]
+    one_hour = START + timedelta(hours=1)
+    assert history.ratings_as_of(one_hour - timedelta(microseconds=1)) == saved[0]
+    assert history.ratings_as_of(one_hour) == saved[1]
+    assert history.ratings_as_of(START + timedelta(days=365)) == saved[2]
+    # Other time zones name the same moment.
+    eastern = timezone(timedelta(hours=-5))
+    assert history.ratings_as_of(one_hour.astimezone(eastern)) == saved[1]
+
+
+def test_get_bracket_as_of(history, base_ratings, monkeypatch):
+    monkeypatch.setattr(march_madness, "default_history", lambda: history)
+    history.add(base_ratings, fetched_at=START)
+    history.add(dict(base_ratings, Duke=50.0), fetched_at=START + timedelta(days=1))
+
+    def duke_rating(bracket) -> float:
+        return next(team.kenpom for team in bracket.teams if team.kenpom_id == "Duke")
+
+    before = march_madness.get_bracket(as_of=START + timedelta(hours=1))
+    after = march_madness.get_bracket(as_of=START + timedelta(days=2))
+
+    assert duke_rating(before) == base_ratings["Duke"]
+    assert duke_rating(after) == 50.0
+    assert [game.winner_index for game in before.games] == [
+        game.winner_index for game in march_madness.get_bracket().games
+    ]
+    with pytest.raises(LookupError):
+        march_madness.get_bracket(as_of=START - timedelta(days=1))
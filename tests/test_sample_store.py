@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+
+from march_madness.sample_reader import SampleReader, StoredSimGroup
+from march_madness.sample_store import (
+    SampleStore,
+    pack_outcomes,
+    simulate_to_store,
+    unpack_outcomes,
+)
+from march_madness.vectorized import BatchSimGroup, simulate_outcomes
+from march_madness.win_probability import BestSeedWins, EloStyle
+
+SIM_COUNT = 1_000
+SEED = 3
+
+
+@pytest.fixture
+def outcomes(bracket):
+    return simulate_outcomes(
+        bracket, EloStyle().matrix(bracket), SIM_COUNT, np.random.default_rng(SEED)
+    )
+
+
+def test_pack_round_trip(bracket, outcomes):
+    packed = pack_outcomes(bracket, outcomes)
+
+    assert packed.shape == (SIM_COUNT, 8)
+    assert np.array_equal(unpack_outcomes(bracket, packed), outcomes)
+
+
+def test_store_round_trip(bracket, outcomes, tmp_path):
+    path = tmp_path / "test.samples"
+    store = SampleStore.create(path, bracket)
+    store.append(outcomes[:600])
+    store.append(outcomes[600:])
+
+    reopened = SampleStore(path)
+    assert len(reopened) == SIM_COUNT
+    assert reopened.data_offset % 64 == 0
+    assert reopened.matches(bracket, EloStyle())
+    assert not reopened.matches(bracket, BestSeedWins())
+    assert np.array_equal(reopened.outcomes(), outcomes)
+    assert np.array_equal(reopened.outcomes(100, 200), outcomes[100:200])
+    with pytest.raises(FileExistsError):
+        SampleStore.create(path, bracket)
+
+
+def test_truncated_last_row_is_ignored(bracket, outcomes, tmp_path):
+    path = tmp_path / "test.samples"
+    store = SampleStore.create(path, bracket)
+    store.append(outcomes[:500])
+    # An append interrupted partway through a row.
+    with open(path, "ab") as file:
+        file.write(pack_outcomes(bracket, outcomes[500:501]).tobytes()[:3])
+
+    assert len(store) == 500
+    assert np.array_equal(store.outcomes(), outcomes[:500])
+
+    store.append(outcomes[500:])
+    assert len(store) == SIM_COUNT
+    assert np.array_equal(store.outcomes(), outcomes)
+
+
+def test_reader_totals_match_outcomes(bracket, tmp_path):
+    path = tmp_path / "test.samples"
+    store = simulate_to_store(path, bracket, SIM_COUNT, seed=SEED)
+    outcomes = store.outcomes()
+    reader = SampleReader(path, chunk_size=300, workers=1)
+
+    totals = reader.totals()
+    assert totals.sample_count == SIM_COUNT
+    for game_id, counts in enumerate(totals.game_counts):
+        assert np.array_equal(
+            counts, np.bincount(outcomes[:, game_id], minlength=len(counts))
+        )
+
+    game = bracket.undecided_games()[0]
+    given = ((game.game_id, game.team1_index),)
+    assert reader.totals(given=given).sample_count == np.count_nonzero(
+        outcomes[:, game.game_id] == game.team1_index
+    )
+
+
+def test_stored_sim_group_matches_batch_sim_group(bracket, group, tmp_path):
+    path = tmp_path / "test.samples"
+    simulate_to_store(path, bracket, SIM_COUNT, seed=SEED)
+
+    stored = StoredSimGroup(group, path, chunk_size=300, workers=1, suppress_print=True)
+    batch = BatchSimGroup(
+        group=group,
+        current_bracket=bracket,
+        sim_count=SIM_COUNT,
+        seed=SEED,
+        suppress_print=True,
+    )
+
+    assert stored.sim_count == SIM_COUNT
+    assert stored.winner_prob == pytest.approx(batch.winner_prob)
+    assert stored.user_average_scores == pytest.approx(batch.user_average_scores)
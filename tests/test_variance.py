@@ -0,0 +1,69 @@
+import numpy as np
+
+from march_madness.variance import compare_winners
+from march_madness.vectorized import BatchSimulation, uniform_draws
+
+SIM_COUNT = 2_000
+SEED = 7
+
+
+def test_antithetic_draws_mirror_each_other():
+    draws = uniform_draws(SIM_COUNT, 63, np.random.default_rng(SEED), antithetic=True)
+    half = SIM_COUNT // 2
+
+    assert np.array_equal(draws[half:], 1 - draws[:half])
+    assert np.array_equal(
+        draws,
+        uniform_draws(SIM_COUNT, 63, np.random.default_rng(SEED), antithetic=True),
+    )
+
+
+def test_scenarios_share_outcomes_off_the_forced_path(bracket):
+    game = bracket.current_round_games()[0]
+    draws = uniform_draws(
+        SIM_COUNT, len(bracket.games), np.random.default_rng(SEED), antithetic=True
+    )
+    outcomes = []
+    for winner_index in [game.team1_index, game.team2_index]:
+        scenario = bracket.clone()
+        scenario.advance_winner(scenario.games[game.game_id], winner_index)
+        sim = BatchSimulation(
+            bracket=scenario, sim_count=SIM_COUNT, draws=draws, suppress_print=True
+        )
+        outcomes.append(sim.outcomes)
+
+    path = set()
+    game_id = game.game_id
+    while game_id is not None:
+        path.add(game_id)
+        game_id = bracket.topology().next_game_id[game_id]
+    off_path = [game_id for game_id in range(len(bracket.games)) if game_id not in path]
+    team1_outcomes, team2_outcomes = outcomes
+
+    assert (team1_outcomes[:, game.game_id] == game.team1_index).all()
+    assert (team2_outcomes[:, game.game_id] == game.team2_index).all()
+    assert np.array_equal(team1_outcomes[:, off_path], team2_outcomes[:, off_path])
+
+
+def test_compare_winners_is_reproducible(bracket, group):
+    game = bracket.current_round_games()[0]
+
+    first = compare_winners(group, bracket, game, SIM_COUNT, seed=SEED)
+    second = compare_winners(group, bracket, game, SIM_COUNT, seed=SEED)
+
+    assert first == second
+
+
+def test_paired_difference_has_lower_variance(bracket, group):
+    game = bracket.current_round_games()[0]
+
+    comparison = compare_winners(group, bracket, game, SIM_COUNT, seed=SEED)
+
+    contenders = [
+        user
+        for user in comparison.difference
+        if comparison.team1_winner_prob[user] or comparison.team2_winner_prob[user]
+    ]
+    assert contenders
+    for user in contenders:
+        assert comparison.variance_reduction[user] > 1
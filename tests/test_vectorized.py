@@ -0,0 +1,18 @@
+import numpy as np
+import pytest
+
+from march_madness.vectorized import pick_matrix
+
+
+def test_pick_matrix(group):
+    picks = pick_matrix(group.entries)
+
+    assert picks.shape == (len(group.entries), 63)
+    assert picks.dtype == np.int8
+    assert (picks >= 0).all()
+
+
+def test_pick_matrix_needs_entries():
+    with pytest.raises(ValueError, match="No entries"):
+        pick_matrix([])
+